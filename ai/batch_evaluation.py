@@ -0,0 +1,95 @@
+"""
+Evaluation of many boards at once with NumPy.
+
+Boards are encoded as rows of 768 (12 pieces x 64 squares) zeros and ones and all of them 
+are evaluated with a single dot product against the values of ai.evaluation.PIECE_SQUARE_VALUES.
+The evaluations are the same as those of ai.evaluation.evaluate
+"""
+from array import array
+
+import chess
+import numpy as np
+
+from ai.evaluation import PIECE_SQUARE_VALUES
+
+# the (color, piece_type) of each of the 12 planes of an encoded board
+PLANES = [ (color, piece_type) for color in (chess.WHITE, chess.BLACK) for piece_type in chess.PIECE_TYPES ]
+
+WEIGHTS = np.array(
+    [ PIECE_SQUARE_VALUES[color][piece_type] for color, piece_type in PLANES ], dtype=np.float64
+).reshape(len(PLANES) * 64)
+
+# the number of boards encoded at a time by evaluate_bitboards. The encoded boards are converted to floats 
+# for the dot product, which takes 6KB per board, so large batches are split to bound the memory used
+CHUNK_SIZE = 1024
+
+def board_bitboards(board: chess.Board) -> tuple:
+    """
+    Returns the 12 bitboards of the pieces on the board in the order of PLANES
+    """
+    white = board.occupied_co[chess.WHITE]
+    black = board.occupied_co[chess.BLACK]
+
+    return (
+        board.pawns & white, board.knights & white, board.bishops & white, 
+        board.rooks & white, board.queens & white, board.kings & white,
+        board.pawns & black, board.knights & black, board.bishops & black, 
+        board.rooks & black, board.queens & black, board.kings & black,
+    )
+
+def encode_bitboards(bitboards) -> np.ndarray:
+    """
+    Encodes a sequence of tuples returned by board_bitboards into an array of shape (N, 768) 
+    where the column plane * 64 + square is 1 if the piece of the plane is on the square
+    """
+    bitboards = np.asarray(bitboards, dtype="<u8").reshape(-1, len(PLANES))
+
+    # bit i of a bitboard is the square i
+    bits = np.unpackbits(bitboards.view(np.uint8), bitorder="little")
+
+    return bits.reshape(len(bitboards), len(PLANES) * 64)
+
+def encode_boards(boards) -> np.ndarray:
+    return encode_bitboards([ board_bitboards(board) for board in boards ])
+
+def evaluate_bitboards(bitboards) -> np.ndarray:
+    """
+    Returns an array of the evaluations of the boards whose bitboards are passed
+    """
+    bitboards = np.asarray(bitboards, dtype="<u8").reshape(-1, len(PLANES))
+    evaluations = np.empty(len(bitboards), dtype=np.float64)
+
+    for start in range(0, len(bitboards), CHUNK_SIZE):
+        evaluations[start:start + CHUNK_SIZE] = encode_bitboards(bitboards[start:start + CHUNK_SIZE]) @ WEIGHTS
+
+    return evaluations
+
+def evaluate_boards(boards) -> np.ndarray:
+    """
+    Returns an array of the evaluations of the boards, e.g for the analysis of the positions of many games
+    """
+    return evaluate_bitboards([ board_bitboards(board) for board in boards ])
+
+class BoardBatch:
+    """
+    Collects boards to be evaluated together along with an item for each of them (e.g. a tree node).
+    Only the bitboards of the boards are kept, in a flat array of 96 bytes per board
+    """
+    def __init__(self) -> None:
+        self.items = []
+        self.bitboards = array('Q')
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def add(self, item, board: chess.Board):
+        self.items.append(item)
+        self.bitboards.extend(board_bitboards(board))
+
+    def evaluate(self) -> list:
+        """
+        Returns a list of tuples of the items and the evaluations of their boards
+        """
+        evaluations = evaluate_bitboards(np.frombuffer(self.bitboards, dtype=np.uint64))
+
+        return list(zip(self.items, evaluations.tolist()))
@@ -0,0 +1,102 @@
+"""
+Opening books in the Polyglot .bin format. The file is memory-mapped by chess.polyglot and its
+entries, which are sorted by zobrist key, are binary searched so the book is never loaded into memory
+and processes reading the same book share the operating system's page cache
+"""
+import random
+
+import chess
+import chess.polyglot
+
+class OpeningBook:
+    """
+    Finds the moves of a position in a Polyglot book.
+
+    selection is "weighted" to choose one of the position's moves at random with a probability
+    proportional to its weight or "best" to always choose the move with the largest weight.
+    Positions after max_ply plies (if it is set) aren't looked up
+    """
+    SELECTIONS = ("weighted", "best")
+
+    def __init__(
+        self, path: str, selection: str="weighted", minimum_weight: int=1, max_ply: int=None, seed=None
+    ) -> None:
+        if selection not in self.SELECTIONS:
+            raise ValueError(f"selection must be one of {self.SELECTIONS}")
+
+        self.path = path
+        self.selection = selection
+        self.minimum_weight = minimum_weight
+        self.max_ply = max_ply
+        self.random = random.Random(seed)
+
+        # the reader is opened on the first lookup so that a player can be created
+        # in one process and used in another
+        self.reader: chess.polyglot.MemoryMappedReader = None
+
+        self.lookups = 0
+        self.hits = 0
+
+    def open(self) -> chess.polyglot.MemoryMappedReader:
+        if self.reader is None:
+            self.reader = chess.polyglot.open_reader(self.path)
+
+        return self.reader
+
+    def close(self):
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+
+    def __enter__(self):
+        self.open()
+
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __getstate__(self) -> dict:
+        # the memory map can't be pickled, it is reopened in the other process
+        state = self.__dict__.copy()
+        state["reader"] = None
+
+        return state
+
+    def get_entries(self, board: chess.Board) -> list:
+        """
+        Returns the entries of the board's position with at least minimum_weight
+        """
+        return list( self.open().find_all(board, minimum_weight=self.minimum_weight) )
+
+    def find_move(self, board: chess.Board) -> chess.Move:
+        """
+        Returns a move of the book for the board's position or None if the position isn't in the book
+        """
+        if self.max_ply is not None and board.ply() >= self.max_ply:
+            return None
+
+        self.lookups += 1
+
+        entries = self.get_entries(board)
+
+        if not entries:
+            return None
+
+        self.hits += 1
+
+        if self.selection == "best":
+            return max(entries, key=lambda entry: entry.weight).move
+
+        total_weight = sum(entry.weight for entry in entries)
+
+        if total_weight == 0:
+            return self.random.choice(entries).move
+
+        choice = self.random.randint(0, total_weight - 1)
+
+        for entry in entries:
+            choice -= entry.weight
+
+            if choice < 0:
+                return entry.move
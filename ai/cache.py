@@ -0,0 +1,102 @@
+"""
+A cache of board evaluations shared by the players of a process so that positions reached again
+(in sibling subtrees, in the searches of the next moves or by another player) aren't evaluated again
+"""
+from collections import OrderedDict
+
+import chess
+
+from ai.transposition import zobrist_key
+
+class EvaluationCache:
+    """
+    Keeps the evaluations of the last capacity positions evaluated, indexed by their Zobrist hash.
+    When the cache is full the least recently used evaluation is evicted.
+
+    The evaluations depend on the evaluation function so a cache must only be shared by players
+    evaluating boards the same way
+    """
+    def __init__(self, capacity: int=65536) -> None:
+        if capacity < 1:
+            raise ValueError("The capacity of the cache must be at least 1")
+
+        self.capacity = capacity
+        self.evaluations = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.evaluations)
+
+    def __getstate__(self) -> dict:
+        # a copy sent to another process starts empty
+        state = self.__dict__.copy()
+        state["evaluations"] = OrderedDict()
+        state["hits"] = 0
+        state["misses"] = 0
+
+        return state
+
+    def get(self, key: int) -> float:
+        """
+        Returns the evaluation of the position with the key or None if it isn't in the cache
+        """
+        evaluations = self.evaluations
+        value = evaluations.get(key)
+
+        if value is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+
+        try:
+            evaluations.move_to_end(key)
+        except KeyError:
+            # evicted in the meantime by a search pondering in another thread
+            pass
+
+        return value
+
+    def put(self, key: int, value: float):
+        evaluations = self.evaluations
+        evaluations[key] = value
+
+        if len(evaluations) > self.capacity:
+            try:
+                evaluations.popitem(last=False)
+            except KeyError:
+                pass
+
+    def evaluate(self, board: chess.Board, evaluate) -> float:
+        """
+        Returns the evaluation of the board from the cache,
+        positions that aren't in it are evaluated with evaluate(board) and added to it
+        """
+        key = zobrist_key(board)
+        value = self.get(key)
+
+        if value is None:
+            value = evaluate(board)
+            self.put(key, value)
+
+        return value
+
+    @property
+    def probes(self) -> int:
+        return self.hits + self.misses
+
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0
+
+    def clear(self):
+        self.evaluations.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __str__(self) -> str:
+        return f"EvaluationCache({len(self)}/{self.capacity} positions, {self.hit_rate():.0%} hits)"
+
+    def __repr__(self) -> str:
+        return self.__str__()
@@ -0,0 +1,105 @@
+"""
+An asyncio interface to the alpha-beta search of MiniMaxPlayer. Searches run in an executor
+so the event loop isn't blocked, they work on a copy of the board and return a SearchResult
+instead of playing the move, so many games can be hosted by a single event loop
+"""
+import asyncio
+import threading
+
+import chess
+import chess.engine
+
+from ai.players import MiniMaxPlayer
+from ai.search import SearchResult
+
+# the depth searched when the limit only has a time or a node limit
+MAX_DEPTH = 64
+
+class AsyncEngine:
+    """
+    Analyses positions with the search of a MiniMaxPlayer created with search="alphabeta",
+    its transposition table and move orderer are kept between analyses.
+
+    The analyses of an engine run one at a time, games that should be analysed
+    at the same time need an engine each
+    """
+    def __init__(self, player: MiniMaxPlayer=None, executor=None) -> None:
+        if player is None:
+            player = MiniMaxPlayer(chess.Board(), "w", search="alphabeta")
+
+        self.player = player
+
+        # None for the default executor of the event loop
+        self.executor = executor
+
+        self.stop_event: threading.Event = None
+        self.lock = asyncio.Lock()
+
+    async def analyse(self, board: chess.Board, limit: chess.engine.Limit=None, progress=None) -> SearchResult:
+        """
+        Searches the board within the limit and returns the result of the deepest completed iteration.
+        limit.depth is in plies, limit.time in seconds and limit.nodes is a number of nodes,
+        by default the board is searched to the player's search_plies.
+
+        progress is called on the event loop with the result after each completed iteration
+        (depth, score, pv, nodes and time). If the task awaiting analyse is cancelled the search
+        is stopped, stop can be called to end it early and still get its result
+        """
+        if limit is None:
+            limit = chess.engine.Limit()
+
+        if limit.depth is not None:
+            max_depth = limit.depth
+        elif limit.time is not None or limit.nodes is not None:
+            max_depth = MAX_DEPTH
+        else:
+            max_depth = self.player.search_plies
+
+        board = board.copy()
+        loop = asyncio.get_running_loop()
+
+        callback = None
+
+        if progress is not None:
+            def callback(result: SearchResult):
+                snapshot = SearchResult(result.move, result.score, result.depth, result.nodes, result.time)
+                snapshot.pv = result.pv
+
+                loop.call_soon_threadsafe(progress, snapshot)
+
+        async with self.lock:
+            search = self.player.create_search()
+            search.stop_event = self.stop_event = threading.Event()
+
+            def run() -> SearchResult:
+                return search.iterative_deepening(
+                    board, max_depth, time_limit=limit.time, node_limit=limit.nodes, callback=callback
+                )
+
+            future = loop.run_in_executor(self.executor, run)
+
+            try:
+                # the future is shielded so that the search is still waited for when the task is cancelled
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                search.stop_event.set()
+                await asyncio.wait([future])
+
+                raise
+            finally:
+                self.stop_event = None
+
+    async def play(self, board: chess.Board, limit: chess.engine.Limit=None) -> chess.Move:
+        """
+        Returns the move the engine would play on the board
+        """
+        result = await self.analyse(board, limit)
+
+        return result.move
+
+    def stop(self):
+        """
+        Ends the current analysis, it returns the result of the last completed iteration
+        """
+        if self.stop_event is not None:
+            self.stop_event.set()
@@ -0,0 +1,114 @@
+"""
+Evaluation of boards using the values and piece-square tables of the Piece class.
+
+The evaluation of a board is the sum of the values of its pieces and the values of the
+squares they are on. It is positive when white is better and negative when black is better
+"""
+import chess
+
+from gui_components.pieces import Piece
+
+PIECE_NOTATIONS = {
+    chess.PAWN: "p", chess.KNIGHT: "n", chess.BISHOP: "b",
+    chess.ROOK: "r", chess.QUEEN: "q", chess.KING: "k"
+}
+
+def create_piece_square_values() -> list:
+    """
+    Normalizes the piece-square tables of the Piece class into lists of 64 values (one for each
+    chess.Square) that include the value of the piece.
+
+    The tables are written from the 8th rank down to the 1st like the string of a board
+    and some of their ranks have more than 8 entries, only the first 8 entries of a rank are used
+    as they are the ones Piece.get_piece_value_from_notation_and_position reads.
+
+    The values are indexed by [color][piece_type][square], color being chess.WHITE or chess.BLACK
+    """
+    values = [None, None]
+
+    for color, color_notation in ((chess.WHITE, "w"), (chess.BLACK, "b")):
+        values[color] = [None] * 7
+
+        for piece_type, notation in PIECE_NOTATIONS.items():
+            values[color][piece_type] = [
+                Piece.get_piece_value_from_notation_and_position(
+                    notation, color_notation, 7 - chess.square_rank(square), chess.square_file(square)
+                )
+                for square in chess.SQUARES
+            ]
+
+    return values
+
+PIECE_SQUARE_VALUES = create_piece_square_values()
+
+def evaluate(board: chess.Board) -> float:
+    """
+    Returns the evaluation of the board by reading its bitboards
+    """
+    evaluation = 0
+
+    for color in chess.COLORS:
+        color_values = PIECE_SQUARE_VALUES[color]
+        occupied = board.occupied_co[color]
+
+        for piece_type in chess.PIECE_TYPES:
+            values = color_values[piece_type]
+
+            for square in chess.scan_forward(board.pieces_mask(piece_type, color) & occupied):
+                evaluation += values[square]
+
+    return evaluation
+
+def move_delta(board: chess.Board, move: chess.Move) -> float:
+    """
+    Returns the change in the evaluation of the board if the move is pushed on it
+    without pushing the move. The move must be legal
+    """
+    color = board.turn
+    values = PIECE_SQUARE_VALUES[color]
+    piece_type = board.piece_type_at(move.from_square)
+
+    delta = values[move.promotion or piece_type][move.to_square] - values[piece_type][move.from_square]
+
+    if piece_type == chess.KING and board.is_castling(move):
+        rank = chess.square_rank(move.from_square)
+
+        if board.is_kingside_castling(move):
+            rook_from, rook_to = chess.square(7, rank), chess.square(5, rank)
+        else:
+            rook_from, rook_to = chess.square(0, rank), chess.square(3, rank)
+
+        delta += values[chess.ROOK][rook_to] - values[chess.ROOK][rook_from]
+
+    elif board.is_en_passant(move):
+        captured_square = chess.square(chess.square_file(move.to_square), chess.square_rank(move.from_square))
+        delta -= PIECE_SQUARE_VALUES[not color][chess.PAWN][captured_square]
+
+    else:
+        captured_piece_type = board.piece_type_at(move.to_square)
+
+        if captured_piece_type:
+            delta -= PIECE_SQUARE_VALUES[not color][captured_piece_type][move.to_square]
+
+    return delta
+
+class IncrementalEvaluator:
+    """
+    Keeps the evaluation of a board up to date as moves are pushed and popped through it
+    instead of evaluating the whole board after every move
+    """
+    def __init__(self, board: chess.Board) -> None:
+        self.evaluations = [ evaluate(board) ]
+
+    @property
+    def evaluation(self) -> float:
+        return self.evaluations[-1]
+
+    def push(self, board: chess.Board, move: chess.Move):
+        self.evaluations.append( self.evaluations[-1] + move_delta(board, move) )
+        board.push(move)
+
+    def pop(self, board: chess.Board) -> chess.Move:
+        self.evaluations.pop()
+
+        return board.pop()
@@ -0,0 +1,127 @@
+"""
+Ordering of the moves searched by the alpha-beta search. The sooner the best move of a
+position is searched the more of the other moves are pruned
+"""
+import chess
+
+from ai.evaluation import PIECE_NOTATIONS
+from gui_components.pieces import Piece
+
+# the scores of the different kinds of moves, moves with higher scores are searched first
+HASH_MOVE_SCORE = 1000000
+CAPTURE_SCORE = 100000
+PROMOTION_SCORE = 90000
+KILLER_SCORE = 80000
+
+# history scores are halved when one of them reaches this value so that they stay below KILLER_SCORE
+MAX_HISTORY_SCORE = 50000
+
+def piece_type_value(piece_type: int) -> int:
+    return Piece.colors_notations_and_values["w"][PIECE_NOTATIONS[piece_type]]
+
+PIECE_TYPE_VALUES = [0] + [ piece_type_value(piece_type) for piece_type in chess.PIECE_TYPES ]
+
+class MoveOrderer:
+    """
+    Orders the moves of a position: the move from the transposition table first, then the captures
+    with the most valuable victims and least valuable attackers (MVV-LVA), then promotions, then the
+    killer moves of the ply (quiet moves that caused a cutoff in a sibling position)
+    and finally the other quiet moves sorted by how often they caused cutoffs (history heuristic)
+    """
+    KILLERS_PER_PLY = 2
+
+    def __init__(self) -> None:
+        self.killers = []
+        # history scores indexed by [color][from_square * 64 + to_square]
+        self.history = [ [0] * 64 * 64, [0] * 64 * 64 ]
+
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+    def new_search(self):
+        """
+        Forgets the killer moves and ages the history scores of the previous search
+        """
+        self.killers = []
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+        for color in chess.COLORS:
+            self.history[color] = [ score // 2 for score in self.history[color] ]
+
+    def get_killers(self, ply: int) -> list:
+        while len(self.killers) <= ply:
+            self.killers.append([])
+
+        return self.killers[ply]
+
+    def is_quiet(self, board: chess.Board, move: chess.Move) -> bool:
+        return not move.promotion and not board.is_capture(move)
+
+    def score_move(self, board: chess.Board, move: chess.Move, killers: list, hash_move: chess.Move=None) -> int:
+        if move == hash_move:
+            return HASH_MOVE_SCORE
+
+        if board.is_capture(move):
+            if board.is_en_passant(move):
+                victim = chess.PAWN
+            else:
+                victim = board.piece_type_at(move.to_square)
+
+            attacker = board.piece_type_at(move.from_square)
+
+            return CAPTURE_SCORE + PIECE_TYPE_VALUES[victim] * 100 - PIECE_TYPE_VALUES[attacker]
+
+        if move.promotion:
+            return PROMOTION_SCORE + PIECE_TYPE_VALUES[move.promotion]
+
+        if move in killers:
+            return KILLER_SCORE + self.KILLERS_PER_PLY - killers.index(move)
+
+        return self.history[board.turn][move.from_square * 64 + move.to_square]
+
+    def order_moves(self, board: chess.Board, ply: int, hash_move: chess.Move=None) -> list:
+        """
+        Returns the legal moves of the board in the order they should be searched.
+        Moves with the same score stay in the order of board.legal_moves
+        """
+        killers = self.get_killers(ply)
+        moves = list(board.legal_moves)
+
+        moves.sort(key=lambda move: self.score_move(board, move, killers, hash_move), reverse=True)
+
+        return moves
+
+    def record_cutoff(self, board: chess.Board, move: chess.Move, ply: int, depth: int, move_number: int):
+        """
+        Called when move caused a beta cutoff on board (before the move is pushed).
+        move_number is the position of the move in the order it was searched starting from 0
+        """
+        self.cutoffs += 1
+
+        if move_number == 0:
+            self.first_move_cutoffs += 1
+
+        if not self.is_quiet(board, move):
+            return
+
+        killers = self.get_killers(ply)
+
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[self.KILLERS_PER_PLY:]
+
+        history = self.history[board.turn]
+        index = move.from_square * 64 + move.to_square
+        history[index] += depth * depth
+
+        if history[index] >= MAX_HISTORY_SCORE:
+            for color in chess.COLORS:
+                self.history[color] = [ score // 2 for score in self.history[color] ]
+
+    def first_move_cutoff_rate(self) -> float:
+        """
+        The fraction of the cutoffs that were caused by the first move searched.
+        The closer it is to 1 the better the ordering
+        """
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0
@@ -0,0 +1,219 @@
+"""
+Root-parallel alpha-beta search. The legal moves of the position are split between worker
+processes, each of them searches its moves with iterative deepening and the results are merged.
+
+Positions are sent to the workers as FEN strings and moves as UCI strings so that nothing 
+but short strings cross the process boundaries
+"""
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import chess
+
+from ai.ordering import MoveOrderer
+from ai.search import MATE_SCORE, AlphaBetaSearch, SearchResult
+from ai.tablebase import EndgameTablebase
+from ai.transposition import TranspositionTable
+
+# the transposition tables of a worker process, kept between the tasks it runs. Indexed by size in MB
+_worker_transposition_tables = {}
+
+# the tablebases of a worker process indexed by directory, their caches are kept between tasks
+_worker_tablebases = {}
+
+# set by the process running the ParallelSearch to stop the searches of its workers
+_worker_stop_event = None
+
+# seconds between the checks of ParallelSearch.stop_event while the workers are searching
+STOP_POLL_INTERVAL = 0.01
+
+# the workers are spawned rather than forked: searches are often started from a thread (the UCI engine,
+# the game's window) and a process forked while another thread holds a lock, e.g. the one of stdin, 
+# can deadlock before it runs its first task
+MULTIPROCESSING_CONTEXT = multiprocessing.get_context("spawn")
+
+def initialize_worker(stop_event):
+    global _worker_stop_event
+
+    _worker_stop_event = stop_event
+
+def search_moves_in_worker(
+    fen: str, moves: list, max_depth: int, time_limit: float=None, node_limit: int=None,
+    hash_size_mb: float=16, quiescence_depth: int=0, quiescence_checks: bool=False, tablebase_directory: str=None,
+    order_moves: bool=True
+) -> tuple:
+    """
+    Runs in a worker process. Searches the moves (UCI strings) of the position with iterative deepening
+    and returns a tuple of the completed iterations as (depth, move, score) tuples with UCI moves 
+    and the number of nodes searched
+    """
+    board = chess.Board(fen)
+
+    table = None
+
+    if hash_size_mb:
+        if hash_size_mb not in _worker_transposition_tables:
+            _worker_transposition_tables[hash_size_mb] = TranspositionTable(hash_size_mb)
+
+        table = _worker_transposition_tables[hash_size_mb]
+
+    tablebase = None
+
+    if tablebase_directory:
+        if tablebase_directory not in _worker_tablebases:
+            _worker_tablebases[tablebase_directory] = EndgameTablebase(tablebase_directory)
+
+        tablebase = _worker_tablebases[tablebase_directory]
+
+    search = AlphaBetaSearch(
+        None, table, MoveOrderer() if order_moves else None, 
+        quiescence_depth=quiescence_depth, quiescence_checks=quiescence_checks, tablebase=tablebase
+    )
+    search.stop_event = _worker_stop_event
+
+    result = search.iterative_deepening(
+        board, max_depth, time_limit=time_limit, node_limit=node_limit, 
+        moves=[ chess.Move.from_uci(move) for move in moves ]
+    )
+
+    iterations = [ (depth, move.uci(), score) for depth, move, score in result.iterations ]
+
+    return iterations, result.nodes
+
+class ParallelSearch:
+    """
+    Splits the root moves of a position between workers processes. 
+    The processes are started on the first search (or by start) and kept until close is called.
+    The workers are spawned so they import the __main__ module of the program, which must only 
+    start it under an if __name__ == "__main__" guard. The positions are evaluated by ai.evaluation.
+
+    Like AlphaBetaSearch.stop_event, stop_event can be set from another thread to end the search 
+    and get the result of the deepest iteration completed, stop does the same
+    """
+    def __init__(
+        self, workers: int, hash_size_mb: float=16, quiescence_depth: int=0, quiescence_checks: bool=False,
+        tablebase_directory: str=None, order_moves: bool=True
+    ) -> None:
+        if workers < 1:
+            raise ValueError("There must be at least one worker")
+
+        self.workers = workers
+        self.hash_size_mb = hash_size_mb
+        self.quiescence_depth = quiescence_depth
+        self.quiescence_checks = quiescence_checks
+        self.tablebase_directory = tablebase_directory
+        self.order_moves = order_moves
+        self.executor: ProcessPoolExecutor = None
+
+        self.stop_event: threading.Event = None
+        # set by stop, kept apart from worker_stop_event so that a search stopped while the workers start is stopped
+        self.stop_requested = threading.Event()
+        # shared with the worker processes, it is set when stop_event is set or stop is called
+        self.worker_stop_event = None
+
+    def split_moves(self, board: chess.Board) -> list:
+        """
+        Deals the legal moves, ordered from the most to the least promising, to the workers 
+        one at a time so that each of them gets some of the best moves
+        """
+        moves = MoveOrderer().order_moves(board, 0)
+        number_of_chunks = min(self.workers, len(moves))
+
+        return [ moves[i::number_of_chunks] for i in range(number_of_chunks) ]
+
+    def search(self, board: chess.Board, max_depth: int, time_limit: float=None, node_limit: int=None) -> SearchResult:
+        """
+        Returns the best move at the deepest depth that every worker completed.
+        The node limit is shared equally between the workers and the time spent starting 
+        the worker processes on the first search is taken from the time limit
+        """
+        start = time.monotonic()
+        self.stop_requested.clear()
+
+        chunks = self.split_moves(board)
+
+        if not chunks:
+            return SearchResult(None, -MATE_SCORE if board.is_check() else 0)
+
+        self.start()
+        self.worker_stop_event.clear()
+
+        if time_limit is not None:
+            time_limit = max(time_limit - (time.monotonic() - start), 0)
+
+        worker_node_limit = node_limit // len(chunks) if node_limit is not None else None
+        fen = board.fen()
+
+        futures = [
+            self.executor.submit(
+                search_moves_in_worker, fen, [ move.uci() for move in chunk ], max_depth, time_limit, 
+                worker_node_limit, self.hash_size_mb, self.quiescence_depth, self.quiescence_checks,
+                self.tablebase_directory, self.order_moves
+            )
+            for chunk in chunks
+        ]
+
+        pending = futures
+
+        while pending:
+            if self.stop_requested.is_set() or (self.stop_event is not None and self.stop_event.is_set()):
+                self.worker_stop_event.set()
+
+            _, pending = wait(pending, timeout=STOP_POLL_INTERVAL)
+
+        worker_results = [ future.result() for future in futures ]
+
+        result = SearchResult(chunks[0][0])
+        result.nodes = sum(nodes for _, nodes in worker_results)
+
+        completed = [ iterations for iterations, _ in worker_results if iterations ]
+
+        if completed:
+            # the scores of different depths can't be compared so the depth every worker completed is used. 
+            # Workers that stopped deepening because they found a mate keep their last result at any depth
+            depths = [ iterations[-1][0] for iterations in completed if abs(iterations[-1][2]) < MATE_SCORE - max_depth ]
+            depth = min(depths) if depths else max( iterations[-1][0] for iterations in completed )
+
+            for iterations in completed:
+                _, move, score = iterations[ min(depth, len(iterations)) - 1 ]
+
+                if result.score is None or score > result.score:
+                    result.move, result.score = chess.Move.from_uci(move), score
+
+            result.depth = depth
+
+        result.time = time.monotonic() - start
+
+        return result
+
+    def start(self):
+        """
+        Starts the worker processes if they haven't been started yet
+        """
+        if self.executor is None:
+            self.worker_stop_event = MULTIPROCESSING_CONTEXT.Event()
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=MULTIPROCESSING_CONTEXT,
+                initializer=initialize_worker, initargs=(self.worker_stop_event,)
+            )
+
+            # the processes are only started when tasks are submitted
+            for future in [ self.executor.submit(int) for _ in range(self.workers) ]:
+                future.result()
+
+    def stop(self):
+        """
+        Stops the searches of the workers, search returns the result of the iterations they completed
+        """
+        self.stop_requested.set()
+
+        if self.worker_stop_event is not None:
+            self.worker_stop_event.set()
+
+    def close(self):
+        if self.executor is not None:
+            self.stop()
+            self.executor.shutdown()
+            self.executor = None
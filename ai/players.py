@@ -2,15 +2,32 @@
 The ai algorithms that can be chosen to play a game against
 """
 import copy
+import logging
 import random
-import re
-from pprint import pprint
+import threading
+import time
 
 import chess
 from gui_components.board import ChessBoard
-from gui_components.pieces import Piece
 
-from data_structures.trees import Node, Tree
+from data_structures.trees import ArrayTree, Node, Tree
+from ai import evaluation
+from ai.book import OpeningBook
+from ai.cache import EvaluationCache
+
+try:
+    from ai import batch_evaluation
+except ImportError:
+    # numpy isn't installed, the leaves of moves trees are evaluated one at a time
+    batch_evaluation = None
+from ai.ordering import MoveOrderer
+from ai.parallel import ParallelSearch
+from ai.search import AlphaBetaSearch, SearchResult
+from ai.statistics import SearchStatistics
+from ai.streaming import iter_moves_tree, minimax_from_stream
+from ai.tablebase import EndgameTablebase
+from ai.transposition import TranspositionTable, decode_move, encode_move, zobrist_key
+from tracing import ai_logger, enabled, trace
 
 class Player:
     def __init__(self, name: str, color: str, board: chess.Board) -> None:
@@ -51,7 +68,22 @@ class MoveNodeData:
 class MoveNode(Node):
     def __init__(self, data, children: list = None, parent=None):
         super().__init__(data, children, parent)
-        self.total_weight = self.get_total_weight()
+        self.total_weight = self.get_weight_from_parent()
+
+    def get_weight_from_parent(self):
+        """
+        Returns the total weight of this node from the total weight of its parent in constant time
+        """
+        weight = self.data.evaluation or 0
+
+        if self.parent is not None:
+            weight += self.parent.total_weight
+
+        return weight
+
+    def update_from_parent(self):
+        super().update_from_parent()
+        self.total_weight = self.get_weight_from_parent()
 
     def __str__(self) -> str:
         return f"Move number: {self.data.fullmove_number}, evaluation: {self.data.evaluation} move: {self.data.move.__str__()}"
@@ -84,22 +116,37 @@ class MoveNode(Node):
     def get_total_weight(self):
         """
         The total weight is the sum of all the weights of this 
-        node's ancestors
+        node's ancestors. It is kept in the total_weight attribute, this method recomputes it 
+        by walking up to the root
         """
         node = self.parent
-        weight = self.data.evaluation
+        weight = self.data.evaluation or 0
 
         while node is not None:
-            weight += node.data.evaluation
+            weight += node.data.evaluation or 0
             node = node.parent
         
         return weight
 
 class AIPlayer:
-    def __init__(self, board: chess.Board, color: str) -> None:
+    # when True every node of the moves tree gets its own deep copy of the board (the old behaviour, 
+    # kept for benchmarking), otherwise the moves are pushed and popped on a single board
+    copy_boards = False
+
+    def __init__(
+        self, board: chess.Board, color: str, opening_book: OpeningBook=None, tablebase: EndgameTablebase=None,
+        evaluation_cache: EvaluationCache=None
+    ) -> None:
         self.board = board
         self.color = color
 
+        # moves of positions in the book or the tablebase are played without searching
+        self.opening_book = opening_book
+        self.tablebase = tablebase
+
+        # the evaluations of evaluate_board are looked up in it first, it can be shared between players
+        self.evaluation_cache = evaluation_cache
+
     def get_legal_moves(self, board: chess.Board=None):
         if not board:
             board = self.board
@@ -120,7 +167,11 @@ class AIPlayer:
     def false_move(self, move: chess.Move=None, board: chess.Board=None) -> chess.Board:
         # make a copy of the board for move testing
         if not board:
-            board_copy = copy.deepcopy(self.board)
+            if self.copy_boards:
+                board_copy = copy.deepcopy(self.board)
+            else:
+                # the move stack isn't needed to test a move
+                board_copy = self.board.copy(stack=False)
         else:
             board_copy = board
 
@@ -131,47 +182,86 @@ class AIPlayer:
 
         return board_copy
 
-    def evaluate_board(self, board: chess.Board=None) -> int:
-        print("Calling evaluate_board method")
+    def evaluate_board(self, board: chess.Board=None) -> float:
+        """
+        Returns the sum of the values of the pieces on the board and the values of the squares 
+        they are on. Positive evaluations are good for white and negative ones for black
+        """
         if board is None: 
             board = self.board
 
-        regex = re.compile("\w")
-        string = board.__str__()
-        
-        material_sum = 0
+        return evaluation.evaluate(board)
 
-        ranks = [ row.split(' ') for row in string.split('\n')]
-        
-        black_eval = 0
-        white_eval = 0
+    def get_evaluation(self, board: chess.Board=None) -> float:
+        """
+        Returns the evaluation of evaluate_board from the evaluation cache if the player has one.
+        Hashing a board costs about as much as the default evaluation so the cache pays off 
+        when evaluate_board is overridden with a slower evaluation
+        """
+        if board is None:
+            board = self.board
+
+        if self.evaluation_cache is None:
+            return self.evaluate_board(board)
+
+        return self.evaluation_cache.evaluate(board, self.evaluate_board)
 
-        for i, rank in enumerate(ranks):
-            for j, notation in enumerate(rank):
-                if regex.search(notation):
-                    piece_color = Piece.get_piece_color_based_on_notation(notation)
-                    piece_positional_value = Piece.get_piece_value_from_notation_and_position(notation, piece_color, i, j)
-                    
-                    black_eval += piece_positional_value if piece_color == "b" else 0
-                    white_eval += piece_positional_value if piece_color == "w" else 0
+    def select_move(self, board: chess.Board=None) -> chess.Move:
+        """
+        Returns the move of the opening book or the tablebase for the board if there is one, 
+        otherwise the move of choose_move
+        """
+        if board is None:
+            board = self.board
 
-                    material_sum += piece_positional_value
+        if self.opening_book is not None:
+            move = self.opening_book.find_move(board)
 
-        return material_sum
+            if move is not None:
+                return move
+
+        if self.tablebase is not None:
+            move = self.tablebase.find_move(board)
+
+            if move is not None:
+                return move
+
+        return self.choose_move(board)
 
     def make_move(self, chess_board: ChessBoard):
-        move = self.choose_move()
+        move = self.select_move()
         chess_board._play(move=move)
 
+    def close(self):
+        """
+        Releases the resources of the player (threads, processes), called when the game ends
+        """
+        pass
+
     def create_moves_subtree(
         self, board: chess.Board, move, tree: Tree, 
-        parent_node, current_height, required_height
+        parent_node, current_height, required_height, pending_leaves=None
     ):
-        try:
+        """
+        Adds the node of the move and its descendants to the tree. 
+        The move is pushed on the board and popped once the subtree is created 
+        so the board is returned in the state it was passed in.
+
+        If pending_leaves is a batch_evaluation.BoardBatch, the leaves are not evaluated, instead 
+        they are added to it with their boards to be evaluated together later
+        """
+        if self.copy_boards:
             board = copy.deepcopy(board)
 
-            board.push(move)
-            evaluation = self.evaluate_board(board)
+        board.push(move)
+
+        try:
+            is_leaf = current_height == required_height
+
+            if is_leaf and pending_leaves is not None:
+                evaluation = 0
+            else:
+                evaluation = self.get_evaluation(board)
 
             data = MoveNodeData(move, evaluation, board.fullmove_number)
 
@@ -179,36 +269,47 @@ class AIPlayer:
 
             tree.add_node(parent_node=parent_node, new_node=node)
 
-            if current_height == required_height:
+            if is_leaf:
+                if pending_leaves is not None:
+                    pending_leaves.add(node, board)
+
                 return node
             
             else:
                 for _move in board.legal_moves:
                     self.create_moves_subtree(
-                        board, _move, tree, node, current_height+1, required_height
+                        board, _move, tree, node, current_height+1, required_height, pending_leaves
                     )
                 
                 return node
 
         except AssertionError as e:
-            print(f"Got assetion error")
-            print("The board is")
-            pprint(board.__str__().split('\n'))
-            print(f"The move to make is: {move}")
-            breakpoint()
+            ai_logger.error("Got assertion error making the move %s on the board\n%s", move, board)
             raise e
 
-    def compute_moves_tree(self, required_height=4, board: chess.Board=None):
+        finally:
+            if not self.copy_boards:
+                board.pop()
+
+    def compute_moves_tree(self, required_height=4, board: chess.Board=None, evaluate_in_batches: bool=None):
         """
         Creates a tree of all the possible moves in the game to a certain depth with a root node that is "empty".
         The root node has no real significance in the game but is created because we wanted to instill a tree 
         data structure but at eery point in time in a game there can be multiple moes thus making it 
-        difficult to select a root from them
+        difficult to select a root from them.
+
+        If evaluate_in_batches is True the leaves are evaluated all at once with NumPy after the tree is created.
+        By default it is done when NumPy is installed and evaluate_board isn't overridden
         """
         if not board:
             # create a copy of the board so as not to affect the actual board
             board = self.board
 
+        if evaluate_in_batches is None:
+            evaluate_in_batches = self.can_evaluate_in_batches()
+
+        pending_leaves = batch_evaluation.BoardBatch() if evaluate_in_batches else None
+
         root_node = MoveNode(MoveNodeData()) # create a root node with evaluation 0 and move None
         
         tree = Tree(root_node=root_node)
@@ -217,11 +318,81 @@ class AIPlayer:
         for move in board.legal_moves:
             self.create_moves_subtree(
                 board=board, move=move, tree=tree, parent_node=root_node, current_height=0,
-                required_height=required_height
+                required_height=required_height, pending_leaves=pending_leaves
             )
 
+        if pending_leaves:
+            self.evaluate_leaves(pending_leaves)
+
+        return tree
+
+    def compute_moves_array_tree(self, required_height=4, board: chess.Board=None) -> ArrayTree:
+        """
+        Creates the same tree as compute_moves_tree in an ArrayTree, which takes a fraction of the memory.
+        The moves of the nodes are encoded with ai.transposition.encode_move
+        """
+        if not board:
+            board = self.board
+
+        tree = ArrayTree()
+
+        if type(self).evaluate_board is AIPlayer.evaluate_board:
+            evaluator = evaluation.IncrementalEvaluator(board)
+        else:
+            evaluator = None
+
+        def add_subtree(parent: int, current_height: int):
+            for move in list(board.legal_moves):
+                if evaluator is not None:
+                    evaluator.push(board, move)
+                    node_evaluation = evaluator.evaluation
+                else:
+                    board.push(move)
+                    node_evaluation = self.get_evaluation(board)
+
+                try:
+                    node = tree.add_node(parent, encode_move(move), node_evaluation, board.fullmove_number)
+
+                    if current_height < required_height:
+                        add_subtree(node, current_height + 1)
+                finally:
+                    if evaluator is not None:
+                        evaluator.pop(board)
+                    else:
+                        board.pop()
+
+        add_subtree(ArrayTree.ROOT, 0)
+
         return tree
 
+    def iter_moves_tree(self, required_height=4, board: chess.Board=None):
+        """
+        Yields (path, evaluation) records of the nodes of the tree compute_moves_tree would create 
+        without creating it, see ai.streaming.iter_moves_tree
+        """
+        if not board:
+            board = self.board
+
+        evaluate = None if type(self).evaluate_board is AIPlayer.evaluate_board else self.get_evaluation
+
+        return iter_moves_tree(board, required_height, evaluate)
+
+    def can_evaluate_in_batches(self) -> bool:
+        """
+        Batches are evaluated with the piece-square values of ai.evaluation so they can't be 
+        used by players that override evaluate_board
+        """
+        return batch_evaluation is not None and type(self).evaluate_board is AIPlayer.evaluate_board
+
+    def evaluate_leaves(self, pending_leaves):
+        """
+        Evaluates the leaves collected by create_moves_subtree with a single 
+        NumPy call and sets the nodes' evaluations
+        """
+        for node, value in pending_leaves.evaluate():
+            node.data.evaluation = value
+            node.total_weight += value
+
 class RandomPlayer(AIPlayer):
     def play(self) -> chess.Move:
         legal_moves = list(self.board.legal_moves)
@@ -231,6 +402,10 @@ class RandomPlayer(AIPlayer):
         return move
 
 class PlayerWithEvaluation(AIPlayer):
+    # when True the moves are compared by the change in the evaluation they cause (ai.evaluation.move_delta) 
+    # which is computed without copying the board. Only used when evaluate_board isn't overridden
+    use_delta_evaluation = True
+
     def play(self) -> chess.Move:
         return super().play()
     
@@ -239,12 +414,15 @@ class PlayerWithEvaluation(AIPlayer):
         
         random.shuffle(legal_moves)
 
+        if self.use_delta_evaluation and type(self).evaluate_board is AIPlayer.evaluate_board:
+            return self.choose_move_by_delta(legal_moves)
+
         chosen_move = None
 
         for move in legal_moves:
-            evaluation_before = self.evaluate_board()
+            evaluation_before = self.get_evaluation()
             fake_board = self.false_move(move)
-            evaluation_after = self.evaluate_board(fake_board)
+            evaluation_after = self.get_evaluation(fake_board)
 
             if chosen_move is None:
                 chosen_move = move
@@ -258,13 +436,113 @@ class PlayerWithEvaluation(AIPlayer):
         
         return chosen_move
 
+    def choose_move_by_delta(self, legal_moves: list) -> chess.Move:
+        """
+        Selects a move from legal_moves like choose_move: the last move that improves the evaluation 
+        for the player after the first one, or the first move if none of the others does
+        """
+        if not legal_moves:
+            return None
+
+        board = self.board
+        chosen_move = legal_moves[0]
+
+        for move in legal_moves[1:]:
+            delta = evaluation.move_delta(board, move)
+
+            if (delta > 0 and self.color == "w") or (delta < 0 and self.color == "b"):
+                chosen_move = move
+
+        return chosen_move
+
 
 class MiniMaxPlayer(PlayerWithEvaluation):
-    def __init__(self, board: chess.Board, color: str, search_depth=3) -> None:
-        super().__init__(board, color)
+    # "minimax" builds the whole moves tree before selecting a move while "alphabeta"
+    # searches the board depth first and never builds the tree
+    SEARCHES = ("minimax", "alphabeta")
+
+    def __init__(
+        self, board: chess.Board, color: str, search_depth=3, search: str="minimax", 
+        time_limit: float=None, node_limit: int=None, hash_size_mb: float=16, order_moves: bool=True,
+        quiescence_depth: int=0, quiescence_checks: bool=False, workers: int=1, compact_tree: bool=False,
+        stream_tree: bool=False, opening_book: OpeningBook=None, tablebase: EndgameTablebase=None,
+        ponder: bool=False, statistics_callback=None, evaluation_cache: EvaluationCache=None
+    ) -> None:
+        super().__init__(board, color, opening_book, tablebase, evaluation_cache)
+
+        if search not in self.SEARCHES:
+            raise ValueError(f"search must be one of {self.SEARCHES}")
+
+        if ponder and (search != "alphabeta" or workers > 1):
+            raise ValueError("Only the alphabeta search with one worker can ponder")
+
+        if search == "alphabeta" and workers > 1 and (
+            type(self).evaluate_board is not AIPlayer.evaluate_board or evaluation_cache is not None
+        ):
+            raise ValueError("The workers of the parallel search can't use an overridden evaluate_board or an evaluation cache")
+
+        # the moves tree of the last move and the board's moves when it was computed
         self.moves_tree: Tree = None
+        self.moves_tree_moves = []
         self.last_move_node: MoveNode = None
+
+        # the minimax search builds an ArrayTree instead of a tree of MoveNodes, it isn't reused between moves
+        self.compact_tree = compact_tree
+        # the minimax search runs over the records of iter_moves_tree, only the current path is kept in memory
+        self.stream_tree = stream_tree
         self.search_depth = search_depth
+        self.search = search
+        self.nodes_searched = 0
+
+        # the alphabeta search deepens iteratively until one of these limits is reached 
+        # when either of them is set. time_limit is in seconds
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.last_search_result: SearchResult = None
+
+        # the transposition table of the alphabeta search, it is kept between moves. 
+        # It is created on the first search so that minimax players don't allocate it
+        self.hash_size_mb = hash_size_mb
+        self.transposition_table: TranspositionTable = None
+
+        # the killer moves and history scores of the alphabeta search, also kept between moves
+        self.move_orderer = MoveOrderer() if order_moves else None
+
+        # the number of plies of captures and promotions searched by the alphabeta search after 
+        # search_plies to avoid evaluating positions where pieces are hanging, 0 to disable it
+        self.quiescence_depth = quiescence_depth
+        self.quiescence_checks = quiescence_checks
+
+        # the number of processes the root moves of the alphabeta search are split between. 
+        # The worker processes import the program's __main__ module, so a program starting a game 
+        # at import (like main.py) can't use more than one
+        self.workers = workers
+        self.parallel_search: ParallelSearch = None
+
+        # after each move the reply the player expects is searched in a background thread while the 
+        # opponent is thinking. If the opponent plays it the search is continued instead of started over
+        self.ponder = ponder
+        self.ponder_thread: threading.Thread = None
+        self.ponder_search: AlphaBetaSearch = None
+        # the moves of the position being pondered, the board of the ponder thread changes as it is searched
+        self.ponder_moves: list = None
+        self.ponder_result: SearchResult = None
+        self.ponder_hits = 0
+
+        # called with the SearchStatistics of every move chosen, they are also kept in last_search_result
+        self.statistics_callback = statistics_callback
+
+        if search == "alphabeta" and workers > 1:
+            # starting the worker processes takes a while, it mustn't be taken from the time of the first move
+            self.get_parallel_search().start()
+
+    @property
+    def search_plies(self) -> int:
+        """
+        The number of plies searched. search_depth doesn't count the first move 
+        (see compute_moves_tree) so the first move is added here
+        """
+        return self.search_depth + 1
 
     def minimax(self, node: MoveNode, is_max=None):
         """
@@ -277,17 +555,48 @@ class MiniMaxPlayer(PlayerWithEvaluation):
             is_max = self.color == 'w'
 
         if len(node.children) > 0:
+            leaves = [ self.minimax(child, not is_max) for child in node.children ]
+
             if is_max:
-                return max( [ self.minimax(child, not is_max) for child in node.children ] )
+                return max( leaves, key=lambda leaf: leaf.data.evaluation )
             else:
-                return min( [ self.minimax(child, not is_max) for child in node.children ] )
+                return min( leaves, key=lambda leaf: leaf.data.evaluation )
         else:
             return node
 
-    def expand_subtree_to_depth(self, root_node: MoveNode, depth=None, revise_existing_children=False, board: chess.Board=None) -> Tree:
+    def minimax_array_tree(self, tree: ArrayTree, index: int=ArrayTree.ROOT, is_max=None) -> int:
+        """
+        The same as minimax for an ArrayTree, returns the index of the optimal leaf
+        """
+        if is_max is None:
+            is_max = self.color == 'w'
+
+        if tree.is_leaf(index):
+            return index
+
+        evaluations = tree.evaluations
+        best_leaf = None
+
+        for child in tree.iter_children(index):
+            leaf = self.minimax_array_tree(tree, child, not is_max)
+
+            if (
+                best_leaf is None 
+                or (is_max and evaluations[leaf] > evaluations[best_leaf])
+                or (not is_max and evaluations[leaf] < evaluations[best_leaf])
+            ):
+                best_leaf = leaf
+
+        return best_leaf
+
+    def expand_subtree_to_depth(self, root_node: MoveNode, depth=None, board: chess.Board=None) -> Tree:
         """
-        Depth here does not include the root node, just its descendants.
-        The board's latest move must correspond to the root_node's move for this method to work effectively
+        Returns a tree rooted at root_node whose leaves have been expanded so that they are depth plies 
+        below the children of root_node, like in compute_moves_tree, (i.e. depth does not include the root node 
+        or its children). Nodes that are already deep enough are kept as they are.
+
+        board must be the position of root_node, it is copied once and the moves leading to each leaf 
+        are pushed on and popped off the copy so board itself isn't changed
         """
         if depth is None:
             depth = self.search_depth
@@ -297,100 +606,418 @@ class MiniMaxPlayer(PlayerWithEvaluation):
 
         tree = Tree(root_node=root_node)
 
-        current_depth = tree.get_height() - 1
+        _dummy_board = board.copy()
 
-        leaf_nodes = tree.get_leaf_nodes()
-        
-        print(f"The tree's root nodes are: ")
-        print(leaf_nodes)
-
-        for index, node in enumerate(leaf_nodes):
-            print(f"On node: {index+1} of the tree's leaf nodes. The node: ")
-            print(node)
-            _dummy_board = copy.deepcopy(board)
-            # since we are getting the leaf moves, we have to first of all execute all of the 
-            # moves preceding those ones in the tree
-            _node = node.parent
-            
-            moves_to_make = []
+        pending_leaves = batch_evaluation.BoardBatch() if self.can_evaluate_in_batches() else None
 
-            while _node is not root_node:
-                moves_to_make.append(_node)
+        # depth first walk of the tree with the plies of the nodes below root_node
+        # and whether the node's move has to be popped off the board
+        stack = [ (root_node, 0, False) ]
 
-                _node = _node.parent
+        while stack:
+            node, ply, pop_move = stack.pop()
+
+            if pop_move:
+                _dummy_board.pop()
+                continue
+
+            if node is not root_node:
+                _dummy_board.push(node.data.move)
+                stack.append( (node, ply, True) )
+
+            if node.children:
+                stack.extend( (child, ply + 1, False) for child in node.children )
+
+            elif ply <= depth:
+                # the leaf is not deep enough, the heights of its children are ply
+                for move in _dummy_board.legal_moves:
+                    self.create_moves_subtree(
+                        _dummy_board, move, tree, node, ply, depth, pending_leaves
+                    )
+
+        if pending_leaves:
+            self.evaluate_leaves(pending_leaves)
 
-                if _node is None:
-                    break
-            
-            print("This node's parents are: ")
-            print(moves_to_make)
-
-            while moves_to_make:
-                move = moves_to_make.pop()
-                print(f"Executing the move node: {move}")
-                _dummy_board.push(move.data.move)
-
-            try:
-                print("Creating subtree for this leaf node")
-                self.create_moves_subtree(
-                    _dummy_board, node.data.move, tree, 
-                    root_node, current_depth, depth
-                )
-            except Exception as e:
-                raise e
-        
         return tree
 
-    def choose_move(self, board: chess.Board = None):
+    def get_reusable_tree(self, board: chess.Board) -> Tree:
+        """
+        Returns the tree of the previous move rooted at the node of the current position of the board
+        if the board's moves since the previous tree was computed are in that tree, otherwise None.
+        The siblings of the nodes along the way are removed from the tree so they can be garbage collected
+        """
+        if self.moves_tree is None:
+            return None
+
+        tree_moves = self.moves_tree_moves
+        move_stack = board.move_stack
+
+        if len(move_stack) < len(tree_moves) or move_stack[:len(tree_moves)] != tree_moves:
+            # a different game or moves were taken back
+            return None
+
+        node = self.moves_tree.root_node
+
+        for move in move_stack[len(tree_moves):]:
+            node = next( (child for child in node.children if child.data.move == move), None )
+
+            if node is None:
+                return None
+
+        if node is self.moves_tree.root_node:
+            return self.moves_tree
+
+        # keep only the new root's subtree
+        parent = node.parent
+
+        while parent is not None:
+            grandparent = parent.parent
+            parent.children = []
+            parent.parent = None
+            parent = grandparent
+
+        # the depths of the subtree's nodes are counted from the new root
+        node.parent = None
+        node.update_subtree_from_parent()
+
+        return Tree(root_node=node)
+
+    def create_search(self) -> AlphaBetaSearch:
+        if self.transposition_table is None and self.hash_size_mb:
+            self.transposition_table = TranspositionTable(self.hash_size_mb)
+
+        # subclasses with their own evaluate_board are searched with it, otherwise 
+        # the evaluation is updated incrementally by the search
+        evaluate = None if type(self).evaluate_board is AIPlayer.evaluate_board else self.get_evaluation
+
+        return AlphaBetaSearch(
+            evaluate, self.transposition_table, self.move_orderer, 
+            quiescence_depth=self.quiescence_depth, quiescence_checks=self.quiescence_checks,
+            tablebase=self.tablebase
+        )
+
+    def alphabeta(self, board: chess.Board=None) -> chess.Move:
+        """
+        Selects a move with an alpha-beta search which returns the same move as minimax 
+        over the leaves of the moves tree without creating the tree.
+        If the player has a time or node limit the search deepens iteratively up to search_plies 
+        and returns the best move of the deepest search completed within the limits
+        """
         if board is None:
             board = self.board
 
-        if self.last_move_node:
-            grandparent = self.last_move_node.parent
+        if self.workers > 1:
+            return self.parallel_alphabeta(board)
 
-            # check where in the tree the last move is found and deepen the tree from there 
-            # instead of creating a new tree
-            new_root_node = None
-            
-            last_move = board.move_stack.pop()
-
-            # for parent in grandparent.children:
-            #     last_move_node_found = False
-            #     for child in parent.children:
-            #         if child.data.move == last_move and child.data.fullmove_number == board.fullmove_number:
-            #             new_root_node = child
-            #             last_move_node_found = True
-                
-            #     if last_move_node_found:
-            #         break
-            
-            # last_move_node_found = False
-            for child in self.last_move_node.children:
-                if child.data.move == last_move and child.data.fullmove_number == board.fullmove_number:
-                    new_root_node = child
-                    # last_move_node_found = True
-                    break
-
-            tree = self.expand_subtree_to_depth(new_root_node)
-        
+        if self.ponder_thread is not None:
+            if board.move_stack == self.ponder_moves:
+                result = self.finish_pondering()
+
+                self.ponder_hits += 1
+                self.nodes_searched = result.nodes
+                self.last_search_result = result
+
+                return result.move
+
+            self.stop_pondering()
+
+        search = self.create_search()
+
+        if self.time_limit is None and self.node_limit is None:
+            move, score = search.search(board, self.search_plies)
+            result = SearchResult(move, score, self.search_plies, search.nodes)
+            result.statistics = search.statistics
+
+            if self.move_orderer is not None:
+                result.first_move_cutoff_rate = self.move_orderer.first_move_cutoff_rate()
         else:
-            # compute the game tree and get the leaf with the smallest or largest 
-            # evaluation depending on the player's color
-            print("Computing the moves tree")
-            tree = self.compute_moves_tree(required_height=self.search_depth, board=board)
-        
-        # print("Selecting the optimal move using minimax")
-        optimal_node = self.minimax(tree.root_node)
+            result = search.iterative_deepening(
+                board, self.search_plies, time_limit=self.time_limit, node_limit=self.node_limit
+            )
+
+        self.nodes_searched = search.nodes
+        self.last_search_result = result
+
+        return result.move
+
+    def predict_reply(self, board: chess.Board) -> chess.Move:
+        """
+        Returns the best move of the board according to the transposition table or None
+        """
+        if self.transposition_table is None:
+            return None
+
+        entry = self.transposition_table.probe(zobrist_key(board))
+
+        if entry is not None and entry[3] is not None and board.is_legal(entry[3]):
+            return entry[3]
+
+        return None
+
+    def start_pondering(self, board: chess.Board=None):
+        """
+        Starts searching the position after the predicted reply to the last move of the board 
+        in a background thread. The thread searches its own copy of the board and shares the 
+        transposition table and the move orderer, it is stopped before the player searches again
+        """
+        if not self.ponder:
+            return
+
+        if board is None:
+            board = self.board
+
+        self.stop_pondering()
+
+        board = board.copy()
+        reply = self.predict_reply(board)
+
+        if reply is None:
+            return
+
+        board.push(reply)
+
+        if board.is_game_over():
+            return
+
+        search = self.create_search()
+        search.stop_event = threading.Event()
+
+        def ponder():
+            self.ponder_result = search.iterative_deepening(board, self.search_plies)
+
+        self.ponder_search = search
+        self.ponder_moves = board.move_stack[:]
+        self.ponder_result = None
+        self.ponder_thread = threading.Thread(target=ponder, daemon=True)
+        self.ponder_thread.start()
+
+    def finish_pondering(self) -> SearchResult:
+        """
+        Called when the opponent played the predicted reply. The search of the ponder thread becomes 
+        the search of the move: the player's limits are applied to it from now on and it is waited for
+        """
+        deadline = time.monotonic() + self.time_limit if self.time_limit is not None else None
+
+        if deadline is not None or self.node_limit is not None:
+            self.ponder_search.set_limits(deadline, self.node_limit)
+
+        self.ponder_thread.join()
+
+        result = self.ponder_result
+        self.ponder_thread = self.ponder_search = self.ponder_moves = self.ponder_result = None
+
+        return result
+
+    def stop_pondering(self):
+        """
+        Stops the ponder thread if it is running, its result is discarded
+        """
+        if self.ponder_thread is None:
+            return
+
+        self.ponder_search.stop_event.set()
+        self.ponder_thread.join()
+
+        self.ponder_thread = self.ponder_search = self.ponder_moves = self.ponder_result = None
+
+    def get_parallel_search(self) -> ParallelSearch:
+        if self.parallel_search is None:
+            self.parallel_search = ParallelSearch(
+                self.workers, self.hash_size_mb, self.quiescence_depth, self.quiescence_checks,
+                self.tablebase.directory if self.tablebase is not None else None,
+                order_moves=self.move_orderer is not None
+            )
+
+        return self.parallel_search
+
+    def parallel_alphabeta(self, board: chess.Board) -> chess.Move:
+        """
+        Splits the root moves of the alphabeta search between self.workers processes.
+        Each process has its own transposition table of hash_size_mb
+        """
+        result = self.get_parallel_search().search(
+            board, self.search_plies, time_limit=self.time_limit, node_limit=self.node_limit
+        )
+
+        self.nodes_searched = result.nodes
+        self.last_search_result = result
+
+        return result.move
+
+    def set_minimax_result(self, move: chess.Move, evaluation: float, statistics: SearchStatistics):
+        """
+        Keeps the result of a minimax search like the ones of the alphabeta search, 
+        the score is from the player's point of view
+        """
+        score = evaluation if self.color == 'w' or evaluation is None else -evaluation
+
+        self.nodes_searched = statistics.nodes
+        self.last_search_result = SearchResult(move, score, self.search_plies, statistics.nodes, statistics.time)
+        self.last_search_result.statistics = statistics
+
+    def minimax_with_tree(self, board: chess.Board) -> chess.Move:
+        statistics = SearchStatistics()
+
+        with statistics.phase("tree building"):
+            # reuse the tree of the previous move if the moves played since then are in it 
+            # and only compute the missing plies
+            tree = self.get_reusable_tree(board)
+            reused_nodes = len(tree) if tree is not None else 0
+
+            if tree is not None:
+                tree = self.expand_subtree_to_depth(tree.root_node, board=board)
+            else:
+                # compute the game tree and get the leaf with the smallest or largest 
+                # evaluation depending on the player's color
+                tree = self.compute_moves_tree(required_height=self.search_depth, board=board)
+
+        self.moves_tree = tree
+        self.moves_tree_moves = board.move_stack[:]
+
+        with statistics.phase("minimax"):
+            optimal_node = self.minimax(tree.root_node)
 
-        node = optimal_node.parent if optimal_node.parent is not None else node
+        # every node but the root is evaluated when it is created
+        statistics.leaf_evaluations = len(tree) - max(reused_nodes, 1)
+
+        stack = [ (tree.root_node, 0) ]
+
+        while stack:
+            node, ply = stack.pop()
+            statistics.count_node(ply)
+            stack.extend( (child, ply + 1) for child in node.children )
+
+        if optimal_node is tree.root_node:
+            # there are no legal moves
+            self.set_minimax_result(None, None, statistics)
+
+            return None
 
         # get the predecessor of the optimal node that is a direct descendant of the root node
-        while node.parent is not tree.root_node and node.parent is not None:
+        node = optimal_node
+
+        while node.parent is not tree.root_node:
             node = node.parent
 
         self.last_move_node = node
+        self.set_minimax_result(node.data.move, optimal_node.data.evaluation, statistics)
 
         return node.data.move
 
+    def minimax_with_array_tree(self, board: chess.Board) -> chess.Move:
+        statistics = SearchStatistics()
+
+        with statistics.phase("tree building"):
+            tree = self.compute_moves_array_tree(required_height=self.search_depth, board=board)
+
+        with statistics.phase("minimax"):
+            index = self.minimax_array_tree(tree)
+
+        # the nodes are added after their parents so the depths can be computed in one pass
+        depths = [0] * len(tree)
+        statistics.count_node(0)
+
+        for node in range(1, len(tree)):
+            depths[node] = depths[tree.parents[node]] + 1
+            statistics.count_node(depths[node])
+
+        statistics.leaf_evaluations = len(tree) - 1
+
+        if index == ArrayTree.ROOT:
+            # there are no legal moves
+            self.set_minimax_result(None, None, statistics)
+
+            return None
+
+        evaluation = tree.evaluations[index]
+
+        # get the predecessor of the optimal leaf that is a child of the root
+        while tree.get_parent(index) != ArrayTree.ROOT:
+            index = tree.get_parent(index)
+
+        move = decode_move(tree.moves[index])
+        self.set_minimax_result(move, evaluation, statistics)
+
+        return move
+
+    def minimax_with_stream(self, board: chess.Board) -> chess.Move:
+        statistics = SearchStatistics()
+        statistics.count_node(0)
+
+        def count_records(records):
+            for record in records:
+                statistics.count_node(len(record[0]))
+                yield record
+
+        with statistics.phase("streaming minimax"):
+            move, evaluation = minimax_from_stream(
+                count_records(self.iter_moves_tree(required_height=self.search_depth, board=board)), self.color == 'w'
+            )
+
+        statistics.leaf_evaluations = statistics.nodes - 1
+        self.set_minimax_result(move, evaluation, statistics)
+
+        return move
+
+    def select_move(self, board: chess.Board=None) -> chess.Move:
+        if board is None:
+            board = self.board
+
+        if self.ponder_thread is not None and board.move_stack != self.ponder_moves:
+            # the opponent didn't play the predicted reply
+            self.stop_pondering()
+
+        return super().select_move(board)
+
+    def make_move(self, chess_board: ChessBoard):
+        super().make_move(chess_board)
+
+        self.start_pondering(chess_board.board)
+
+    def close(self):
+        """
+        Stops the ponder thread and the worker processes of the parallel search
+        """
+        self.stop_pondering()
+
+        if self.parallel_search is not None:
+            self.parallel_search.close()
+            self.parallel_search = None
+
+    def choose_move(self, board: chess.Board = None):
+        if board is None:
+            board = self.board
+
+        cache = self.evaluation_cache
+
+        if cache is not None:
+            cache_hits, cache_probes = cache.hits, cache.probes
+
+        if self.search == "alphabeta":
+            move = self.alphabeta(board)
+        elif self.stream_tree:
+            move = self.minimax_with_stream(board)
+        elif self.compact_tree:
+            move = self.minimax_with_array_tree(board)
+        else:
+            move = self.minimax_with_tree(board)
+
+        result = self.last_search_result
+
+        if cache is not None and result is not None and result.statistics is not None:
+            result.statistics.evaluation_cache_hits = cache.hits - cache_hits
+            result.statistics.evaluation_cache_probes = cache.probes - cache_probes
+
+        if result is not None and result.statistics is not None and enabled(ai_logger, logging.INFO):
+            trace(
+                ai_logger, "search", logging.INFO, player=self.color, move=str(move), score=result.score, 
+                depth=result.depth, **result.statistics.as_dict()
+            )
+
+        if self.statistics_callback is not None and result is not None and result.statistics is not None:
+            self.statistics_callback(result.statistics)
+
+        return move
+
     def play(self) -> chess.Move:
         return super().play()
\ No newline at end of file
@@ -0,0 +1,578 @@
+"""
+Depth first searches that walk a single chess.Board with push and pop
+instead of materializing the whole tree of moves
+"""
+import threading
+import time
+
+import chess
+
+from ai.evaluation import IncrementalEvaluator
+from ai.ordering import MoveOrderer
+from ai.statistics import SearchStatistics
+from ai.tablebase import LOSS, WIN, EndgameTablebase
+from ai.transposition import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable, zobrist_key
+from tracing import ai_logger
+
+# score given to a checkmate, mates closer to the root are scored higher
+MATE_SCORE = 100000
+
+# scores within this many points of MATE_SCORE are mates
+MAX_MATE_PLIES = 1000
+
+# score of a position won according to the tablebases, lower than the mate scores
+# so that a mate found by the search is preferred
+TABLEBASE_WIN_SCORE = MATE_SCORE - 2 * MAX_MATE_PLIES
+
+# the number of nodes searched between two checks of the clock
+NODES_BETWEEN_TIME_CHECKS = 256
+
+def is_win_score(score: float) -> bool:
+    """
+    Returns True if the score is a mate or a tablebase win for either side, 
+    these scores depend on the ply they are found at
+    """
+    return abs(score) >= TABLEBASE_WIN_SCORE - MAX_MATE_PLIES
+
+def score_to_table(score: float, ply: int) -> float:
+    """
+    Mate and tablebase scores are stored in the transposition table relative to the position 
+    instead of the root of the search
+    """
+    if not is_win_score(score):
+        return score
+
+    return score + ply if score > 0 else score - ply
+
+def score_from_table(score: float, ply: int) -> float:
+    """
+    The inverse of score_to_table
+    """
+    if not is_win_score(score):
+        return score
+
+    return score - ply if score > 0 else score + ply
+
+class SearchTimeout(Exception):
+    """
+    Raised inside a search when its time or node limit has been reached
+    """
+    pass
+
+class SearchResult:
+    def __init__(self, move: chess.Move=None, score: float=None, depth: int=0, nodes: int=0, time: float=0) -> None:
+        self.move = move
+        self.score = score
+        self.depth = depth # the depth of the last completed iteration
+        self.nodes = nodes
+        self.time = time
+
+        # the fraction of the beta cutoffs caused by the first move searched, None without move ordering
+        self.first_move_cutoff_rate: float = None
+
+        # tuples of the depth, best move and score of each completed iteration of iterative deepening
+        self.iterations = []
+
+        # the moves expected to be played from the position, starting with move
+        self.pv = []
+
+        self.statistics: SearchStatistics = None
+
+    def __str__(self) -> str:
+        string = f"Move: {self.move}, score: {self.score}, depth: {self.depth}, nodes: {self.nodes}, time: {self.time:.3f}s"
+
+        if self.first_move_cutoff_rate is not None:
+            string += f", first move cutoffs: {self.first_move_cutoff_rate:.0%}"
+
+        return string
+
+    def __repr__(self) -> str:
+        return self.__str__()
+
+class AlphaBetaSearch:
+    """
+    A negamax search with alpha-beta pruning.
+
+    evaluate is a function that takes a chess.Board and returns its evaluation from
+    white's point of view (positive is good for white) just like AIPlayer.evaluate_board.
+    If it is None the evaluation of ai.evaluation is updated incrementally as moves are pushed and popped.
+    If a transposition table is passed, positions already searched deep enough are not searched again.
+    If a move orderer is passed, the moves most likely to cause cutoffs are searched first.
+
+    If quiescence_depth is more than 0, the positions at the end of the search aren't evaluated 
+    as they are, instead captures and promotions (and checks if quiescence_checks is True) are searched 
+    up to quiescence_depth plies further until the position is quiet.
+
+    If a tablebase is passed, positions with few enough pieces are scored with its WDL tables 
+    right after a capture or a pawn move instead of being searched
+    """
+    def __init__(
+        self, evaluate=None, transposition_table: TranspositionTable=None, move_orderer: MoveOrderer=None,
+        quiescence_depth: int=0, quiescence_checks: bool=False, tablebase: EndgameTablebase=None
+    ) -> None:
+        self.evaluate = evaluate
+        self.transposition_table = transposition_table
+        self.move_orderer = move_orderer
+        self.quiescence_depth = quiescence_depth
+        self.quiescence_checks = quiescence_checks
+        self.tablebase = tablebase
+        self.nodes = 0
+        self.tablebase_hits = 0
+
+        # the counters of the current search, replaced at the start of every search
+        self.statistics = SearchStatistics()
+
+        # set at the start of every search when evaluate is None
+        self.evaluator: IncrementalEvaluator = None
+
+        # limits of the current search, set by iterative_deepening
+        self.deadline = None
+        self.node_limit = None
+
+        # (deadline, node_limit) passed to set_limits, they replace the limits iterative_deepening 
+        # is called with if they are set before it starts
+        self.pending_limits: tuple = None
+
+        # an event set by another thread to stop the search (e.g. when pondering)
+        self.stop_event: threading.Event = None
+
+    def set_limits(self, deadline: float=None, node_limit: int=None):
+        """
+        Limits the search running in another thread to stop at the deadline (a time.monotonic() time) 
+        or after node_limit more nodes. If the search hasn't started yet it gets these limits when it starts
+        """
+        self.pending_limits = (deadline, node_limit)
+
+        if deadline is not None:
+            self.deadline = deadline
+        if node_limit is not None:
+            self.node_limit = self.nodes + node_limit
+
+    def check_limits(self):
+        """
+        Raises a SearchTimeout if the time or node limit of the search has been reached 
+        or the search has been stopped
+        """
+        if self.node_limit is not None and self.nodes >= self.node_limit:
+            raise SearchTimeout()
+
+        if (
+            self.stop_event is not None and self.nodes % NODES_BETWEEN_TIME_CHECKS == 0 
+            and self.stop_event.is_set()
+        ):
+            raise SearchTimeout()
+
+        if (
+            self.deadline is not None and self.nodes % NODES_BETWEEN_TIME_CHECKS == 0 
+            and time.monotonic() >= self.deadline
+        ):
+            raise SearchTimeout()
+
+    def evaluate_relative(self, board: chess.Board) -> float:
+        """
+        Returns the evaluation of the board from the point of view of the side to move
+        """
+        self.statistics.leaf_evaluations += 1
+
+        if self.evaluator is not None:
+            evaluation = self.evaluator.evaluation
+        else:
+            evaluation = self.evaluate(board)
+
+        return evaluation if board.turn == chess.WHITE else -evaluation
+
+    def probe_tablebase(self, board: chess.Board, ply: int) -> float:
+        """
+        Returns the score of the board from the point of view of the side to move according to the tablebase
+        or None if it can't be probed. The WDL tables assume the halfmove clock is 0 so the board is only probed
+        right after a capture or a pawn move
+        """
+        if board.halfmove_clock != 0 or not self.tablebase.can_probe(board):
+            return None
+
+        wdl = self.tablebase.probe_wdl(board)
+
+        if wdl is None:
+            return None
+
+        self.tablebase_hits += 1
+
+        if wdl == WIN:
+            return TABLEBASE_WIN_SCORE - ply
+        if wdl == LOSS:
+            return -TABLEBASE_WIN_SCORE + ply
+
+        # cursed wins and blessed losses are draws
+        return 0
+
+    def start_search(self, board: chess.Board):
+        self.tablebase_hits = 0
+
+        self.statistics = SearchStatistics()
+        self.statistics.count_node(0)
+
+        if self.evaluate is None:
+            self.evaluator = IncrementalEvaluator(board)
+
+        if self.transposition_table is not None:
+            self.transposition_table.new_search()
+
+        if self.move_orderer is not None:
+            self.move_orderer.new_search()
+
+    def push(self, board: chess.Board, move: chess.Move):
+        if self.evaluator is not None:
+            self.evaluator.push(board, move)
+        else:
+            board.push(move)
+
+    def pop(self, board: chess.Board):
+        if self.evaluator is not None:
+            self.evaluator.pop(board)
+        else:
+            board.pop()
+
+    def negamax(self, board: chess.Board, depth: int, alpha: float, beta: float, ply: int=0) -> float:
+        """
+        Returns the score of the board from the point of view of the side to move.
+        The board is returned in the same state it was passed in
+        """
+        self.nodes += 1
+        self.statistics.count_node(ply)
+        self.check_limits()
+
+        if depth <= 0:
+            if self.quiescence_depth > 0:
+                return self.quiescence(board, alpha, beta, ply, self.quiescence_depth)
+
+            return self.evaluate_relative(board)
+
+        table = self.transposition_table
+        hash_move = None
+
+        if table is not None:
+            key = zobrist_key(board)
+            entry = table.probe(key)
+            self.statistics.transposition_probes += 1
+
+            if entry is not None:
+                self.statistics.transposition_hits += 1
+
+                entry_depth, entry_score, bound, hash_move = entry
+                entry_score = score_from_table(entry_score, ply)
+
+                if entry_depth >= depth and (
+                    bound == EXACT 
+                    or (bound == LOWER_BOUND and entry_score >= beta)
+                    or (bound == UPPER_BOUND and entry_score <= alpha)
+                ):
+                    return entry_score
+
+        if self.tablebase is not None:
+            score = self.probe_tablebase(board, ply)
+
+            if score is not None:
+                if table is not None:
+                    table.store(key, depth, score_to_table(score, ply), EXACT)
+
+                return score
+
+        original_alpha = alpha
+        best_score = None
+        best_move = None
+
+        orderer = self.move_orderer
+
+        if orderer is not None:
+            moves = orderer.order_moves(board, ply, hash_move)
+        else:
+            moves = self.get_moves(board, hash_move)
+
+        for move_number, move in enumerate(moves):
+            self.push(board, move)
+            try:
+                score = -self.negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                self.pop(board)
+
+            if best_score is None or score > best_score:
+                best_score = score
+                best_move = move
+
+            if score > alpha:
+                alpha = score
+
+            if score >= beta:
+                self.statistics.cutoffs += 1
+
+                if move_number == 0:
+                    self.statistics.first_move_cutoffs += 1
+
+                if orderer is not None:
+                    orderer.record_cutoff(board, move, ply, depth, move_number)
+
+                break
+
+        if best_score is None:
+            # checkmate or stalemate
+            return -MATE_SCORE + ply if board.is_check() else 0
+
+        if table is not None:
+            if best_score >= beta:
+                bound = LOWER_BOUND
+            elif best_score <= original_alpha:
+                bound = UPPER_BOUND
+            else:
+                bound = EXACT
+
+            table.store(key, depth, score_to_table(best_score, ply), bound, best_move)
+
+        return best_score
+
+    def quiescence(self, board: chess.Board, alpha: float, beta: float, ply: int, depth: int) -> float:
+        """
+        Searches the captures and promotions of the board until there are none left or depth plies
+        have been searched. The side to move can always "stand pat" and keep the evaluation of the board 
+        instead of making a bad capture, except when it is in check, then all its moves are searched.
+        The first call is counted as a node by negamax
+        """
+        in_check = board.is_check()
+
+        if in_check:
+            best_score = None
+        else:
+            best_score = self.evaluate_relative(board)
+
+            if best_score >= beta or depth <= 0:
+                return best_score
+
+            if best_score > alpha:
+                alpha = best_score
+
+        if in_check and depth <= 0:
+            return self.evaluate_relative(board)
+
+        for move in self.get_quiescence_moves(board, in_check, depth == self.quiescence_depth):
+            self.push(board, move)
+            self.nodes += 1
+            self.statistics.count_node(ply + 1)
+            try:
+                self.check_limits()
+                score = -self.quiescence(board, -beta, -alpha, ply + 1, depth - 1)
+            finally:
+                self.pop(board)
+
+            if best_score is None or score > best_score:
+                best_score = score
+
+            if score > alpha:
+                alpha = score
+
+            if score >= beta:
+                break
+
+        if best_score is None:
+            # in check without legal moves
+            return -MATE_SCORE + ply
+
+        return best_score
+
+    def get_quiescence_moves(self, board: chess.Board, in_check: bool, first_ply: bool) -> list:
+        """
+        Returns the moves searched by quiescence: all the legal moves if the side to move is in check, 
+        otherwise the captures, the promotions and, on the first ply of the quiescence search 
+        if quiescence_checks is True, the moves that give check
+        """
+        if in_check:
+            moves = list(board.legal_moves)
+        else:
+            moves = list(board.generate_legal_captures())
+
+            promoting_rank = chess.BB_RANK_7 if board.turn == chess.WHITE else chess.BB_RANK_2
+            promoting_pawns = board.pawns & board.occupied_co[board.turn] & promoting_rank
+
+            if promoting_pawns:
+                moves.extend(board.generate_legal_moves(promoting_pawns, ~board.occupied))
+
+            if self.quiescence_checks and first_ply:
+                moves.extend(
+                    move for move in board.generate_legal_moves(~promoting_pawns, ~board.occupied) 
+                    if board.gives_check(move)
+                )
+
+        if self.move_orderer is not None:
+            moves.sort(key=lambda move: self.move_orderer.score_move(board, move, []), reverse=True)
+
+        return moves
+
+    def get_moves(self, board: chess.Board, hash_move: chess.Move=None):
+        """
+        Yields the legal moves of the board, the move from the transposition table first
+        """
+        if hash_move is not None and board.is_legal(hash_move):
+            yield hash_move
+
+            for move in board.legal_moves:
+                if move != hash_move:
+                    yield move
+        else:
+            yield from board.legal_moves
+
+    def search(self, board: chess.Board, depth: int) -> tuple:
+        """
+        Searches the board depth plies deep and returns a tuple of the best move and its
+        score from the point of view of the side to move. The move is None if there are no legal moves
+        """
+        self.nodes = 1
+        self.start_search(board)
+
+        moves = list(board.legal_moves)
+
+        if self.transposition_table is not None:
+            # search the move from the previous search of this position first
+            entry = self.transposition_table.probe(zobrist_key(board))
+
+            if entry is not None and entry[3] in moves:
+                moves.remove(entry[3])
+                moves.insert(0, entry[3])
+
+        with self.statistics.phase("search"):
+            return self.search_root(board, depth, moves)
+
+    def search_root(self, board: chess.Board, depth: int, moves: list, store: bool=True) -> tuple:
+        """
+        Searches the moves of the root position in the order they are passed. 
+        The result is stored in the transposition table if store is True, it shouldn't be 
+        when only some of the legal moves of the position are passed
+        """
+        best_move = None
+        best_score = -MATE_SCORE - 1
+        alpha = -MATE_SCORE - 1
+        beta = MATE_SCORE + 1
+
+        for move in moves:
+            self.push(board, move)
+            try:
+                score = -self.negamax(board, depth - 1, -beta, -alpha, 1)
+            finally:
+                self.pop(board)
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+
+            if score > alpha:
+                alpha = score
+
+        if best_move is None:
+            best_score = -MATE_SCORE if board.is_check() else 0
+        elif store and self.transposition_table is not None:
+            self.transposition_table.store(zobrist_key(board), depth, score_to_table(best_score, 0), EXACT, best_move)
+
+        return best_move, best_score
+
+    def iterative_deepening(
+        self, board: chess.Board, max_depth: int, time_limit: float=None, node_limit: int=None,
+        moves: list=None, callback=None
+    ) -> SearchResult:
+        """
+        Searches the board at depths 1, 2, ... max_depth until the time limit (in seconds) or the 
+        node limit is reached. The result is that of the last depth that was completely searched, 
+        if not even the first depth was completed the first legal move is returned.
+        Only the moves passed are searched at the root if moves isn't None.
+
+        callback is called with the result after each completed iteration
+        """
+        start = time.monotonic()
+
+        self.nodes = 1
+        self.start_search(board)
+        self.deadline = start + time_limit if time_limit is not None else None
+        self.node_limit = node_limit
+
+        if self.pending_limits is not None:
+            deadline, pending_node_limit = self.pending_limits
+
+            if deadline is not None:
+                self.deadline = deadline
+            if pending_node_limit is not None:
+                self.node_limit = self.nodes + pending_node_limit
+
+        all_moves = moves is None
+
+        if not all_moves:
+            moves = list(moves)
+        elif self.move_orderer is not None:
+            moves = self.move_orderer.order_moves(board, 0)
+        else:
+            moves = list(board.legal_moves)
+
+        result = SearchResult(moves[0] if moves else None)
+        result.statistics = self.statistics
+
+        try:
+            for depth in range(1, max_depth + 1):
+                try:
+                    with self.statistics.phase(f"depth {depth}"):
+                        move, score = self.search_root(board, depth, moves, store=all_moves)
+                except SearchTimeout:
+                    break
+
+                result.move, result.score, result.depth = move, score, depth
+                result.iterations.append( (depth, move, score) )
+                ai_logger.debug("Depth %s: %s with a score of %s after %s nodes", depth, move, score, self.nodes)
+
+                if callback is not None:
+                    result.nodes = self.nodes
+                    result.time = time.monotonic() - start
+                    result.pv = self.get_principal_variation(board, move, depth)
+
+                    callback(result)
+
+                if move is None or abs(score) >= MATE_SCORE - max_depth:
+                    # no legal moves or a forced mate was found, searching deeper won't change the move
+                    break
+
+                # search the best move first in the next iteration
+                moves.remove(move)
+                moves.insert(0, move)
+        finally:
+            self.deadline = None
+            self.node_limit = None
+            self.pending_limits = None
+
+        result.nodes = self.nodes
+        result.time = time.monotonic() - start
+        result.pv = self.get_principal_variation(board, result.move, result.depth)
+
+        if self.move_orderer is not None:
+            result.first_move_cutoff_rate = self.move_orderer.first_move_cutoff_rate()
+
+        return result
+
+    def get_principal_variation(self, board: chess.Board, move: chess.Move, max_length: int) -> list:
+        """
+        Returns move followed by the best moves of the transposition table for the positions after it,
+        at most max_length moves. The board is returned in the same state it was passed in
+        """
+        if move is None:
+            return []
+
+        pv = [move]
+
+        if self.transposition_table is None:
+            return pv
+
+        board = board.copy(stack=False)
+        board.push(move)
+
+        while len(pv) < max_length:
+            entry = self.transposition_table.probe(zobrist_key(board))
+
+            if entry is None or entry[3] is None or not board.is_legal(entry[3]):
+                break
+
+            pv.append(entry[3])
+            board.push(entry[3])
+
+        return pv
@@ -0,0 +1,118 @@
+"""
+Counters collected while a move is being searched to find out where the time of a search goes
+"""
+import time
+from contextlib import contextmanager
+
+# the deepest ply counted, deeper nodes are counted at this ply
+MAX_PLY = 128
+
+class SearchStatistics:
+    """
+    The counters are plain attributes incremented by the searches so that collecting
+    them costs next to nothing, the rates are computed when they are read
+    """
+    def __init__(self) -> None:
+        self.nodes_per_ply = [0] * (MAX_PLY + 1)
+        self.leaf_evaluations = 0
+
+        # beta cutoffs and the ones caused by the first move searched
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+
+        self.transposition_probes = 0
+        self.transposition_hits = 0
+
+        # filled in when the evaluations go through an ai.cache.EvaluationCache
+        self.evaluation_cache_probes = 0
+        self.evaluation_cache_hits = 0
+
+        # seconds spent in each phase of the search, in the order the phases started
+        self.phase_times = {}
+
+    def count_node(self, ply: int):
+        self.nodes_per_ply[min(ply, MAX_PLY)] += 1
+
+    @property
+    def nodes(self) -> int:
+        return sum(self.nodes_per_ply)
+
+    @property
+    def depth(self) -> int:
+        """
+        The deepest ply reached
+        """
+        return max( (ply for ply, nodes in enumerate(self.nodes_per_ply) if nodes), default=0 )
+
+    def get_nodes_per_ply(self) -> list:
+        return self.nodes_per_ply[:self.depth + 1]
+
+    def effective_branching_factor(self) -> float:
+        """
+        The average number of children searched per node: the geometric mean of
+        the ratios of the nodes of each ply to the nodes of the ply before it
+        """
+        depth = self.depth
+
+        if depth == 0 or not self.nodes_per_ply[0]:
+            return 0
+
+        return (self.nodes_per_ply[depth] / self.nodes_per_ply[0]) ** (1 / depth)
+
+    def first_move_cutoff_rate(self) -> float:
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0
+
+    def transposition_hit_rate(self) -> float:
+        return self.transposition_hits / self.transposition_probes if self.transposition_probes else 0
+
+    def evaluation_cache_hit_rate(self) -> float:
+        return self.evaluation_cache_hits / self.evaluation_cache_probes if self.evaluation_cache_probes else 0
+
+    @contextmanager
+    def phase(self, name: str):
+        """
+        Adds the time spent in the with block to the time of the phase
+        """
+        start = time.perf_counter()
+
+        try:
+            yield
+        finally:
+            self.phase_times[name] = self.phase_times.get(name, 0) + time.perf_counter() - start
+
+    @property
+    def time(self) -> float:
+        return sum(self.phase_times.values())
+
+    def as_dict(self) -> dict:
+        return {
+            "nodes": self.nodes,
+            "nodes_per_ply": self.get_nodes_per_ply(),
+            "leaf_evaluations": self.leaf_evaluations,
+            "effective_branching_factor": self.effective_branching_factor(),
+            "cutoffs": self.cutoffs,
+            "first_move_cutoff_rate": self.first_move_cutoff_rate(),
+            "transposition_hit_rate": self.transposition_hit_rate(),
+            "evaluation_cache_hit_rate": self.evaluation_cache_hit_rate(),
+            "phase_times": dict(self.phase_times),
+        }
+
+    def __str__(self) -> str:
+        string = (
+            f"Nodes: {self.nodes} {self.get_nodes_per_ply()}, leaf evaluations: {self.leaf_evaluations}, "
+            f"branching factor: {self.effective_branching_factor():.2f}"
+        )
+
+        if self.cutoffs:
+            string += f", cutoffs: {self.cutoffs} ({self.first_move_cutoff_rate():.0%} first move)"
+        if self.transposition_probes:
+            string += f", transposition hits: {self.transposition_hit_rate():.0%}"
+        if self.evaluation_cache_probes:
+            string += f", evaluation cache hits: {self.evaluation_cache_hit_rate():.0%}"
+
+        phases = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in self.phase_times.items())
+
+        return f"{string}, phases: {phases}" if phases else string
+
+    def __repr__(self) -> str:
+        return self.__str__()
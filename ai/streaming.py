@@ -0,0 +1,144 @@
+"""
+Streaming enumeration of the moves tree. Instead of creating the tree, its nodes are yielded
+as (path, evaluation) records in depth first order so that the memory used only depends on the
+depth of the tree, the consumers below aggregate the records as they arrive
+"""
+import chess
+
+from ai.evaluation import IncrementalEvaluator
+
+def iter_moves_tree(board: chess.Board, required_height: int, evaluate=None):
+    """
+    Yields a (path, evaluation) record for every node of the tree compute_moves_tree would create
+    (without the "empty" root) in depth first order, each node before its children.
+    path is a tuple of the moves from the board's position to the node.
+
+    evaluate is a function returning the evaluation of a board, by default the evaluation of
+    ai.evaluation is updated incrementally. The board is returned in the state it was passed in,
+    also when the consumer stops before the end and the generator is closed
+    """
+    evaluator = IncrementalEvaluator(board) if evaluate is None else None
+    path = []
+
+    def pop_move():
+        path.pop()
+
+        if evaluator is not None:
+            evaluator.pop(board)
+        else:
+            board.pop()
+
+    # a stack of the legal moves left to search at each ply
+    moves_stack = [ iter(list(board.legal_moves)) ]
+
+    try:
+        while moves_stack:
+            move = next(moves_stack[-1], None)
+
+            if move is None:
+                moves_stack.pop()
+
+                if path:
+                    pop_move()
+
+                continue
+
+            if evaluator is not None:
+                evaluator.push(board, move)
+                path.append(move)
+                evaluation = evaluator.evaluation
+            else:
+                board.push(move)
+                path.append(move)
+                evaluation = evaluate(board)
+
+            yield tuple(path), evaluation
+
+            # the first move is at height 0 like in compute_moves_tree
+            if len(path) - 1 < required_height:
+                moves_stack.append( iter(list(board.legal_moves)) )
+            else:
+                pop_move()
+    finally:
+        # the consumer stopped early (closed the generator or raised), the moves of the current path are popped
+        while path:
+            pop_move()
+
+def minimax_from_stream(records, is_max: bool) -> tuple:
+    """
+    Runs minimax over the records of iter_moves_tree and returns a tuple of the first move
+    leading to the optimal leaf and the leaf's evaluation, the same as MiniMaxPlayer.minimax.
+    is_max is True if the player to move maximizes the evaluation (white).
+
+    Only the aggregates of the nodes on the current path are kept
+    """
+    # for the nodes on the current path (index 0 being the root): their own evaluation
+    # and the best leaf evaluation among their children so far
+    evaluations = [None]
+    best_values = [None]
+    best_move = None
+
+    def close_deepest_node():
+        nonlocal best_move
+
+        depth = len(evaluations) - 1
+        evaluation = evaluations.pop()
+        best_value = best_values.pop()
+
+        # a node without children is a leaf
+        value = evaluation if best_value is None else best_value
+
+        # the parent maximizes at even depths if the root maximizes
+        parent_is_max = is_max if (depth - 1) % 2 == 0 else not is_max
+        parent_best = best_values[-1]
+
+        if (
+            parent_best is None
+            or (parent_is_max and value > parent_best)
+            or (not parent_is_max and value < parent_best)
+        ):
+            best_values[-1] = value
+
+            if depth == 1:
+                best_move = current_first_move
+
+    current_first_move = None
+
+    for path, evaluation in records:
+        while len(evaluations) > len(path):
+            close_deepest_node()
+
+        if len(path) == 1:
+            current_first_move = path[0]
+
+        evaluations.append(evaluation)
+        best_values.append(None)
+
+    while len(evaluations) > 1:
+        close_deepest_node()
+
+    return best_move, best_values[0]
+
+def count_nodes_per_depth(records) -> dict:
+    """
+    Returns a dictionary of the number of nodes at each depth of the records, the first moves being at depth 1
+    """
+    counts = {}
+
+    for path, _ in records:
+        counts[len(path)] = counts.get(len(path), 0) + 1
+
+    return counts
+
+def write_records(records, file):
+    """
+    Writes one line per record to a text file: the UCI moves of the path and the evaluation
+    separated by a tab. Returns the number of records written
+    """
+    count = 0
+
+    for path, evaluation in records:
+        file.write(f"{' '.join(move.uci() for move in path)}\t{evaluation}\n")
+        count += 1
+
+    return count
@@ -0,0 +1,170 @@
+"""
+Probing of local Syzygy endgame tablebases with chess.syzygy.
+WDL tables give the result of a position with perfect play (win, draw or loss) and DTZ tables
+the number of plies to the next capture or pawn move that keeps that result
+"""
+import os
+from collections import OrderedDict
+
+import chess
+import chess.syzygy
+
+from ai.transposition import zobrist_key
+
+# the results of the WDL tables from the point of view of the side to move.
+# Cursed wins and blessed losses are drawn by the fifty-move rule
+LOSS = -2
+BLESSED_LOSS = -1
+DRAW = 0
+CURSED_WIN = 1
+WIN = 2
+
+class EndgameTablebase:
+    """
+    Probes the Syzygy tables of one or more directories (separated by os.pathsep).
+
+    Positions are only probed if they have no more pieces than the largest table found and
+    no castling rights, which is checked before anything else. The results of the last cache_size
+    probes are kept in a least recently used cache
+    """
+    def __init__(self, directory: str, cache_size: int=65536) -> None:
+        self.directory = directory
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+
+        # the tables are opened on the first probe so that the tablebase can be sent to another process
+        self.tablebase: chess.syzygy.Tablebase = None
+        self._max_pieces: int = None
+
+        self.probes = 0
+        self.cache_hits = 0
+
+    def open(self) -> chess.syzygy.Tablebase:
+        if self.tablebase is None:
+            self.tablebase = chess.syzygy.Tablebase()
+
+            for directory in self.directory.split(os.pathsep):
+                if directory:
+                    self.tablebase.add_directory(directory)
+
+            # table names are like KQvKR
+            self._max_pieces = max( (len(name) - 1 for name in self.tablebase.wdl), default=0 )
+
+        return self.tablebase
+
+    def close(self):
+        if self.tablebase is not None:
+            self.tablebase.close()
+            self.tablebase = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["tablebase"] = None
+        state["cache"] = OrderedDict()
+
+        return state
+
+    @property
+    def max_pieces(self) -> int:
+        """
+        The number of pieces (kings included) of the largest table
+        """
+        self.open()
+
+        return self._max_pieces
+
+    def can_probe(self, board: chess.Board) -> bool:
+        return chess.popcount(board.occupied) <= self.max_pieces and not board.castling_rights
+
+    def probe(self, board: chess.Board, kind: str):
+        if not self.can_probe(board):
+            return None
+
+        self.probes += 1
+
+        key = (zobrist_key(board), kind)
+        cache = self.cache
+
+        value = cache.get(key, cache)
+
+        if value is not cache:
+            self.cache_hits += 1
+
+            try:
+                cache.move_to_end(key)
+            except KeyError:
+                # evicted in the meantime by a search pondering in another thread
+                pass
+
+            return value
+
+        if kind == "wdl":
+            value = self.tablebase.get_wdl(board)
+        else:
+            value = self.tablebase.get_dtz(board)
+
+        cache[key] = value
+
+        if len(cache) > self.cache_size:
+            cache.popitem(last=False)
+
+        return value
+
+    def probe_wdl(self, board: chess.Board) -> int:
+        """
+        Returns one of LOSS, BLESSED_LOSS, DRAW, CURSED_WIN and WIN for the side to move,
+        None if the position can't be probed or its table is missing.
+        The result assumes the halfmove clock is 0
+        """
+        return self.probe(board, "wdl")
+
+    def probe_dtz(self, board: chess.Board) -> int:
+        """
+        Returns the distance to zeroing of the position, positive when the side to move wins
+        and negative when it loses. None if the position can't be probed or its table is missing
+        """
+        return self.probe(board, "dtz")
+
+    def find_move(self, board: chess.Board) -> chess.Move:
+        """
+        Returns the move that keeps the best result for the side to move: winning moves that capture
+        or move a pawn first, then the ones that get to the next capture or pawn move the fastest,
+        and when losing the moves that delay it the longest.
+        None if the position or one of the positions after its moves can't be probed
+        """
+        if not self.can_probe(board):
+            return None
+
+        best_move = None
+        best_key = None
+
+        for move in list(board.legal_moves):
+            board.push(move)
+            try:
+                wdl = self.probe_wdl(board)
+                dtz = self.probe_dtz(board) if wdl is not None else None
+                zeroing = board.halfmove_clock == 0
+            finally:
+                board.pop()
+
+            if dtz is None:
+                return None
+
+            # the results after the move are from the opponent's point of view
+            result = -wdl
+
+            if result > DRAW:
+                key = (result, zeroing, -abs(dtz))
+            elif result < DRAW:
+                key = (result, False, abs(dtz))
+            else:
+                key = (result, False, 0)
+
+            if best_key is None or key > best_key:
+                best_key = key
+                best_move = move
+
+        return best_move
+
+    def cache_hit_rate(self) -> float:
+        return self.cache_hits / self.probes if self.probes else 0
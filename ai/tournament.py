@@ -0,0 +1,251 @@
+"""
+Headless round-robin tournaments between AI players. The games are played in a pool of
+processes, each game with its own seed so that a tournament can be replayed.
+
+Run from the root of the project:
+python -m ai.tournament --engines random evaluation alphabeta-2 --games 10 --workers 4 --pgn games.pgn
+"""
+import os
+
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import itertools
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import chess
+import chess.pgn
+
+from ai import players
+
+class Entrant:
+    """
+    A player of the tournament: the AIPlayer subclass and the keyword arguments it is created with
+    (besides the board and the color) for every game
+    """
+    def __init__(self, name: str, player_class: type, **options) -> None:
+        self.name = name
+        self.player_class = player_class
+        self.options = options
+
+    def create_player(self, board: chess.Board, color: str) -> players.AIPlayer:
+        return self.player_class(board, color, **self.options)
+
+    def __repr__(self) -> str:
+        return f"Entrant({self.name!r})"
+
+ENTRANTS = {
+    "random": Entrant("random", players.RandomPlayer),
+    "evaluation": Entrant("evaluation", players.PlayerWithEvaluation),
+    "minimax-1": Entrant("minimax-1", players.MiniMaxPlayer, search_depth=1),
+    "minimax-2": Entrant("minimax-2", players.MiniMaxPlayer, search_depth=2),
+    "alphabeta-2": Entrant("alphabeta-2", players.MiniMaxPlayer, search_depth=2, search="alphabeta", hash_size_mb=4),
+    "alphabeta-3": Entrant("alphabeta-3", players.MiniMaxPlayer, search_depth=3, search="alphabeta", hash_size_mb=4),
+    "alphabeta-3q": Entrant(
+        "alphabeta-3q", players.MiniMaxPlayer, search_depth=3, search="alphabeta", hash_size_mb=4, quiescence_depth=4
+    ),
+}
+
+class GameResult:
+    def __init__(self, white: str, black: str, result: str, pgn: str, plies: int, nodes: dict, time: float) -> None:
+        self.white = white
+        self.black = black
+        self.result = result # "1-0", "0-1" or "1/2-1/2"
+        self.pgn = pgn
+        self.plies = plies
+        self.nodes = nodes # the nodes searched by each player, indexed by name
+        self.time = time
+
+    def score(self, name: str) -> float:
+        """
+        Returns the points of the player in the game: 1 for a win, 0.5 for a draw and 0 for a loss
+        """
+        if self.result == "1/2-1/2":
+            return 0.5
+
+        winner = self.white if self.result == "1-0" else self.black
+
+        return 1.0 if winner == name else 0.0
+
+def play_game(white: Entrant, black: Entrant, seed: int, max_plies: int=300, round_number: int=1) -> GameResult:
+    """
+    Plays a game between the entrants. The random module is seeded with seed so that the
+    random choices of the players are the same every time the game is played.
+    Games that last more than max_plies plies are adjudicated as draws
+    """
+    start = time.perf_counter()
+    random.seed(seed)
+
+    board = chess.Board()
+    game_players = {
+        chess.WHITE: white.create_player(board, "w"),
+        chess.BLACK: black.create_player(board, "b")
+    }
+    nodes = { white.name: 0, black.name: 0 }
+    names = { chess.WHITE: white.name, chess.BLACK: black.name }
+
+    try:
+        while board.outcome(claim_draw=True) is None and board.ply() < max_plies:
+            player = game_players[board.turn]
+            move = player.select_move(board)
+
+            nodes[names[board.turn]] += getattr(player, "nodes_searched", 0)
+            board.push(move)
+    finally:
+        for player in game_players.values():
+            player.close()
+
+    outcome = board.outcome(claim_draw=True)
+    result = outcome.result() if outcome is not None else "1/2-1/2"
+
+    game = chess.pgn.Game.from_board(board)
+    game.headers["Event"] = "Chess-Pygame tournament"
+    game.headers["Round"] = str(round_number)
+    game.headers["White"] = white.name
+    game.headers["Black"] = black.name
+    game.headers["Result"] = result
+    game.headers["Seed"] = str(seed)
+
+    if outcome is None:
+        game.headers["Termination"] = "adjudication"
+
+    return GameResult(white.name, black.name, result, str(game), board.ply(), nodes, time.perf_counter() - start)
+
+def schedule_games(entrants: list, games_per_pair: int, seed: int) -> list:
+    """
+    Returns (white, black, seed, round) tuples of a round robin where each pair of entrants
+    plays games_per_pair games, alternating colors
+    """
+    games = []
+
+    for first, second in itertools.combinations(entrants, 2):
+        for i in range(games_per_pair):
+            white, black = (first, second) if i % 2 == 0 else (second, first)
+            games.append( (white, black, seed + len(games), i + 1) )
+
+    return games
+
+def expected_score_to_elo(score: float) -> float:
+    """
+    Returns the rating difference that gives the expected score (between 0 and 1) in the Elo model
+    """
+    return -400 * math.log10(1 / score - 1)
+
+class Tournament:
+    def __init__(self, entrants: list, games_per_pair: int=2, workers: int=None, seed: int=0, max_plies: int=300) -> None:
+        if len(entrants) < 2:
+            raise ValueError("A tournament needs at least two entrants")
+
+        self.entrants = entrants
+        self.games_per_pair = games_per_pair
+        self.workers = workers or os.cpu_count()
+        self.seed = seed
+        self.max_plies = max_plies
+
+        self.results: list = []
+        self.time = 0
+
+    def run(self, progress=None) -> list:
+        """
+        Plays all the games and returns their results in the order they were scheduled.
+        progress is called with each result as soon as its game is over
+        """
+        start = time.perf_counter()
+        games = schedule_games(self.entrants, self.games_per_pair, self.seed)
+        results = [None] * len(games)
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(play_game, white, black, game_seed, self.max_plies, round_number): index
+                for index, (white, black, game_seed, round_number) in enumerate(games)
+            }
+
+            for future in as_completed(futures):
+                result = future.result()
+                results[futures[future]] = result
+
+                if progress is not None:
+                    progress(result)
+
+        self.results = results
+        self.time = time.perf_counter() - start
+
+        return results
+
+    def get_standings(self) -> list:
+        """
+        Returns (name, points, games, elo) tuples sorted by points. elo is the performance of the entrant
+        against the field, relative to the average entrant, a perfect or null score is counted
+        as half a game less so the rating stays finite
+        """
+        standings = []
+
+        for entrant in self.entrants:
+            games = [ result for result in self.results if entrant.name in (result.white, result.black) ]
+            points = sum(result.score(entrant.name) for result in games)
+
+            if games:
+                score = min(max(points, 0.5), len(games) - 0.5) / len(games)
+                elo = expected_score_to_elo(score)
+            else:
+                elo = 0
+
+            standings.append( [entrant.name, points, len(games), elo] )
+
+        average_elo = sum(standing[3] for standing in standings) / len(standings)
+
+        for standing in standings:
+            standing[3] -= average_elo
+
+        standings.sort(key=lambda standing: standing[1], reverse=True)
+
+        return [ tuple(standing) for standing in standings ]
+
+    def get_pgn(self) -> str:
+        return "\n\n".join(result.pgn for result in self.results) + "\n"
+
+    def games_per_second(self) -> float:
+        return len(self.results) / self.time if self.time else 0
+
+    def nodes_per_second(self) -> float:
+        nodes = sum(sum(result.nodes.values()) for result in self.results)
+
+        return nodes / self.time if self.time else 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--engines", nargs="+", default=["random", "evaluation", "alphabeta-2"], choices=list(ENTRANTS))
+    parser.add_argument("--games", type=int, default=2, help="number of games each pair of engines plays")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-plies", type=int, default=300, help="games longer than this are drawn")
+    parser.add_argument("--pgn", help="file the games are written to")
+    arguments = parser.parse_args()
+
+    tournament = Tournament(
+        [ ENTRANTS[name] for name in arguments.engines ], arguments.games, arguments.workers,
+        arguments.seed, arguments.max_plies
+    )
+
+    tournament.run(
+        progress=lambda result: print(f"{result.white} - {result.black}: {result.result} ({result.plies} plies, {result.time:.1f}s)")
+    )
+
+    print()
+    print(f"{'engine':<14} {'points':>7} {'games':>6} {'elo':>6}")
+
+    for name, points, games, elo in tournament.get_standings():
+        print(f"{name:<14} {points:>7.1f} {games:>6} {elo:>+6.0f}")
+
+    print()
+    print(f"{len(tournament.results)} games in {tournament.time:.1f}s: {tournament.games_per_second():.2f} games/s, {tournament.nodes_per_second():.0f} nodes/s")
+
+    if arguments.pgn:
+        with open(arguments.pgn, "w") as file:
+            file.write(tournament.get_pgn())
+
+if __name__ == "__main__":
+    main()
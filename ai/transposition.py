@@ -0,0 +1,126 @@
+"""
+A fixed size transposition table for the alpha-beta search.
+Positions are keyed by their polyglot zobrist hash
+"""
+from array import array
+
+import chess
+import chess.polyglot
+
+# the types of scores that can be stored in the table
+EXACT = 1
+LOWER_BOUND = 2 # the search failed high, the real score is at least the stored score
+UPPER_BOUND = 3 # the search failed low, the real score is at most the stored score
+
+def encode_move(move: chess.Move) -> int:
+    """
+    Encodes a move in 16 bits: 6 for the source square, 6 for the destination square
+    and 3 for the promotion piece type. None is encoded as 0
+    """
+    if move is None:
+        return 0
+
+    promotion = move.promotion - 1 if move.promotion else 0
+
+    return move.from_square | (move.to_square << 6) | (promotion << 12)
+
+def decode_move(value: int) -> chess.Move:
+    """
+    The inverse of encode_move
+    """
+    if value == 0:
+        return None
+
+    promotion = (value >> 12) & 7
+
+    return chess.Move(value & 63, (value >> 6) & 63, promotion + 1 if promotion else None)
+
+def zobrist_key(board: chess.Board) -> int:
+    return chess.polyglot.zobrist_hash(board)
+
+class TranspositionTable:
+    """
+    The table is made of buckets of 2 entries. The first entry of a bucket is depth-preferred:
+    it is only replaced by a search at least as deep or by an entry from a newer search.
+    The second entry is always replaced.
+
+    The entries are stored in parallel arrays so the memory used is fixed when the table is created
+    """
+    # bytes used by one entry: key (8), score (8), move (2), depth (1), bound (1) and generation (1)
+    ENTRY_SIZE = 21
+    ENTRIES_PER_BUCKET = 2
+
+    def __init__(self, size_mb: float=16) -> None:
+        if size_mb <= 0:
+            raise ValueError("The size of the transposition table must be positive")
+
+        self.size_mb = size_mb
+        self.number_of_buckets = max(1, int(size_mb * 1024 * 1024) // (self.ENTRY_SIZE * self.ENTRIES_PER_BUCKET))
+        self.generation = 0
+
+        self.probes = 0
+        self.hits = 0
+
+        self.clear()
+
+    def clear(self):
+        entries = self.number_of_buckets * self.ENTRIES_PER_BUCKET
+
+        self.keys = array('Q', bytes(8 * entries))
+        self.scores = array('d', bytes(8 * entries))
+        self.moves = array('H', bytes(2 * entries))
+        self.depths = array('b', bytes(entries))
+        self.bounds = array('B', bytes(entries)) # 0 if the entry is empty
+        self.generations = array('B', bytes(entries))
+
+    def new_search(self):
+        """
+        Called before each search so that entries from older searches can be replaced first
+        """
+        self.generation = (self.generation + 1) % 256
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def probe(self, key: int) -> tuple:
+        """
+        Returns a tuple of the depth, score, bound and move stored for the key or None
+        if the key is not in the table
+        """
+        self.probes += 1
+
+        index = (key % self.number_of_buckets) * self.ENTRIES_PER_BUCKET
+
+        for i in (index, index + 1):
+            if self.keys[i] == key and self.bounds[i]:
+                self.hits += 1
+
+                return self.depths[i], self.scores[i], self.bounds[i], decode_move(self.moves[i])
+
+        return None
+
+    def store(self, key: int, depth: int, score: float, bound: int, move: chess.Move=None):
+        index = (key % self.number_of_buckets) * self.ENTRIES_PER_BUCKET
+
+        if (
+            not self.bounds[index] or self.keys[index] == key or depth >= self.depths[index]
+            or self.generations[index] != self.generation
+        ):
+            if self.bounds[index] and self.keys[index] != key:
+                # keep the entry that is being replaced in the always-replace slot
+                self._write(index + 1, self.keys[index], self.depths[index], self.scores[index], self.bounds[index], self.moves[index], self.generations[index])
+
+            self._write(index, key, depth, score, bound, encode_move(move), self.generation)
+        else:
+            self._write(index + 1, key, depth, score, bound, encode_move(move), self.generation)
+
+    def _write(self, index, key, depth, score, bound, move, generation):
+        self.keys[index] = key
+        self.depths[index] = depth
+        self.scores[index] = score
+        self.bounds[index] = bound
+        self.moves[index] = move
+        self.generations[index] = generation
+
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0
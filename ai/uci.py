@@ -0,0 +1,316 @@
+"""
+A UCI (Universal Chess Interface) front-end for the alpha-beta search so the engine can be
+used by GUIs, chess.engine and other tools without pygame's window. Run it with: python -m ai.uci
+"""
+import os
+
+# ai.players imports the gui components which import pygame, it mustn't write to stdout
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import sys
+import threading
+import time
+
+import chess
+
+from ai.ordering import MoveOrderer
+from ai.players import MiniMaxPlayer
+from ai.search import MATE_SCORE, MAX_MATE_PLIES, SearchResult
+
+ENGINE_NAME = "Chess-Pygame"
+ENGINE_AUTHOR = "Nguh Prince"
+
+# the depth searched by "go" without a depth limit
+MAX_DEPTH = 64
+
+MAX_HASH_SIZE_MB = 1024
+
+# the fraction of the remaining time used when the number of moves to the next time control isn't known
+DEFAULT_MOVES_TO_GO = 30
+
+# milliseconds kept on the clock for the communication with the GUI
+MOVE_OVERHEAD = 50
+
+def format_score(score: float) -> str:
+    """
+    Returns the score in the format of info lines: "mate <moves>" for mates,
+    otherwise "cp <centipawns>" (the evaluation of a pawn is 1)
+    """
+    if abs(score) >= MATE_SCORE - MAX_MATE_PLIES:
+        plies = MATE_SCORE - abs(score)
+        moves = (int(plies) + 1) // 2
+
+        return f"mate {moves if score > 0 else -moves}"
+
+    return f"cp {round(score * 100)}"
+
+def allocate_time(board: chess.Board, parameters: dict) -> float:
+    """
+    Returns the number of seconds to search for from the parameters of "go" or None if there is no time limit
+    """
+    if "movetime" in parameters:
+        return parameters["movetime"] / 1000
+
+    remaining = parameters.get("wtime" if board.turn == chess.WHITE else "btime")
+
+    if remaining is None:
+        return None
+
+    increment = parameters.get("winc" if board.turn == chess.WHITE else "binc", 0)
+    moves_to_go = parameters.get("movestogo", DEFAULT_MOVES_TO_GO)
+
+    allocated = remaining / max(moves_to_go, 1) + increment * 3 / 4
+    allocated = min(allocated, remaining / 2, remaining - MOVE_OVERHEAD)
+
+    return max(allocated, 10) / 1000
+
+class UCIEngine:
+    """
+    Reads UCI commands and writes the engine's responses. Searches run in a thread
+    so that "stop" and "ponderhit" can be read while the engine is thinking
+    """
+    def __init__(self, output=None) -> None:
+        self.output = output if output is not None else sys.stdout
+        # the search thread and the thread reading the commands both write lines
+        self.output_lock = threading.Lock()
+
+        self.player = MiniMaxPlayer(chess.Board(), "w", search="alphabeta")
+        self.board = chess.Board()
+
+        self.search_thread: threading.Thread = None
+        self.search_stop: threading.Event = None
+
+        # set when the engine may send bestmove: right away unless it is pondering or searching infinitely
+        self.bestmove_allowed: threading.Event = None
+
+        # the search of the current "go" and the time allocated to it, used when a ponder hit happens
+        self.current_search = None
+        self.allocated_time: float = None
+
+        # stops a parallel search the allocated time after a ponder hit
+        self.ponder_timer: threading.Timer = None
+
+    def send(self, line: str):
+        with self.output_lock:
+            self.output.write(line + "\n")
+            self.output.flush()
+
+    def run(self, input=None):
+        input = input if input is not None else sys.stdin
+
+        for line in input:
+            if not self.handle(line):
+                break
+
+        self.stop()
+        self.player.close()
+
+    def handle(self, line: str) -> bool:
+        """
+        Handles a command, returns False if the engine should quit
+        """
+        tokens = line.split()
+
+        if not tokens:
+            return True
+
+        command, arguments = tokens[0], tokens[1:]
+
+        if command == "quit":
+            return False
+        elif command == "uci":
+            self.send(f"id name {ENGINE_NAME}")
+            self.send(f"id author {ENGINE_AUTHOR}")
+            self.send(f"option name Hash type spin default {self.player.hash_size_mb} min 1 max {MAX_HASH_SIZE_MB}")
+            self.send(f"option name Threads type spin default 1 min 1 max {os.cpu_count() or 1}")
+            self.send("option name Ponder type check default false")
+            self.send("uciok")
+        elif command == "isready":
+            self.send("readyok")
+        elif command == "setoption":
+            self.set_option(arguments)
+        elif command == "ucinewgame":
+            self.stop()
+            self.player.transposition_table = None
+            self.player.move_orderer = MoveOrderer()
+        elif command == "position":
+            self.stop()
+            self.set_position(arguments)
+        elif command == "go":
+            self.stop()
+            self.go(arguments)
+        elif command == "stop":
+            self.stop()
+        elif command == "ponderhit":
+            self.ponderhit()
+
+        return True
+
+    def set_option(self, arguments: list):
+        if "name" not in arguments:
+            return
+
+        if "value" in arguments:
+            name = " ".join(arguments[arguments.index("name") + 1:arguments.index("value")])
+            value = " ".join(arguments[arguments.index("value") + 1:])
+        else:
+            name = " ".join(arguments[arguments.index("name") + 1:])
+            value = None
+
+        self.stop()
+
+        if name.lower() == "hash" and value is not None:
+            self.player.hash_size_mb = min(max(int(value), 1), MAX_HASH_SIZE_MB)
+            self.player.transposition_table = None
+        elif name.lower() == "threads" and value is not None:
+            self.player.close()
+            self.player.workers = max(int(value), 1)
+
+            if self.player.workers > 1:
+                # the worker processes are started now rather than in the time of the first search
+                self.player.get_parallel_search().start()
+
+    def set_position(self, arguments: list):
+        if not arguments:
+            return
+
+        if "moves" in arguments:
+            moves = arguments[arguments.index("moves") + 1:]
+            arguments = arguments[:arguments.index("moves")]
+        else:
+            moves = []
+
+        if arguments[0] == "startpos":
+            board = chess.Board()
+        elif arguments[0] == "fen":
+            board = chess.Board(" ".join(arguments[1:]))
+        else:
+            return
+
+        for move in moves:
+            board.push_uci(move)
+
+        self.board = board
+
+    def go(self, arguments: list):
+        parameters = {}
+        flags = set()
+
+        for i, token in enumerate(arguments):
+            if token in ("infinite", "ponder"):
+                flags.add(token)
+            elif token in ("depth", "nodes", "movetime", "wtime", "btime", "winc", "binc", "movestogo"):
+                parameters[token] = int(arguments[i + 1])
+
+        board = self.board.copy()
+        max_depth = parameters.get("depth", MAX_DEPTH)
+        node_limit = parameters.get("nodes")
+        self.allocated_time = allocate_time(board, parameters)
+
+        # when pondering the clock starts at the ponder hit
+        time_limit = None if flags else self.allocated_time
+
+        self.search_stop = threading.Event()
+        self.bestmove_allowed = threading.Event()
+
+        if not flags:
+            self.bestmove_allowed.set()
+
+        if self.player.workers > 1:
+            self.current_search = None
+            target = lambda: self.search_in_parallel(board, max_depth, time_limit, node_limit)
+        else:
+            # the search is created here so that a ponderhit received before the thread runs can limit it
+            search = self.player.create_search()
+            search.stop_event = self.search_stop
+            self.current_search = search
+            target = lambda: self.search(search, board, max_depth, time_limit, node_limit)
+
+        self.search_thread = threading.Thread(target=target, daemon=True)
+        self.search_thread.start()
+
+    def search(self, search, board: chess.Board, max_depth: int, time_limit: float, node_limit: int):
+        result = search.iterative_deepening(
+            board, max_depth, time_limit=time_limit, node_limit=node_limit, callback=self.send_info
+        )
+
+        self.send_bestmove(result)
+
+    def search_in_parallel(self, board: chess.Board, max_depth: int, time_limit: float, node_limit: int):
+        """
+        The root moves are split between the worker processes of the player, 
+        the workers are stopped when the search's stop event is set
+        """
+        parallel_search = self.player.get_parallel_search()
+        parallel_search.stop_event = self.search_stop
+
+        result = parallel_search.search(board, max_depth, time_limit=time_limit, node_limit=node_limit)
+
+        if result.score is not None:
+            self.send_info(result)
+
+        self.send_bestmove(result)
+
+    def send_info(self, result: SearchResult):
+        nps = int(result.nodes / result.time) if result.time else 0
+        pv = " ".join(move.uci() for move in (result.pv or [result.move]))
+
+        self.send(
+            f"info depth {result.depth} score {format_score(result.score)} nodes {result.nodes} "
+            f"nps {nps} time {int(result.time * 1000)} pv {pv}"
+        )
+
+    def send_bestmove(self, result: SearchResult):
+        # in infinite and ponder mode bestmove is only sent after stop or ponderhit
+        self.bestmove_allowed.wait()
+
+        if result.move is None:
+            self.send("bestmove 0000")
+        elif len(result.pv) > 1:
+            self.send(f"bestmove {result.move.uci()} ponder {result.pv[1].uci()}")
+        else:
+            self.send(f"bestmove {result.move.uci()}")
+
+    def ponderhit(self):
+        """
+        The opponent played the move the engine was pondering on, the search continues
+        with the time allocated by the parameters of "go ponder"
+        """
+        if self.bestmove_allowed is None or self.bestmove_allowed.is_set():
+            return
+
+        if self.allocated_time is not None:
+            if self.current_search is not None:
+                self.current_search.set_limits(deadline=time.monotonic() + self.allocated_time)
+            else:
+                self.ponder_timer = threading.Timer(self.allocated_time, self.search_stop.set)
+                self.ponder_timer.daemon = True
+                self.ponder_timer.start()
+
+        self.bestmove_allowed.set()
+
+    def stop(self):
+        """
+        Stops the current search and waits for its bestmove to be sent
+        """
+        if self.search_thread is None:
+            return
+
+        self.search_stop.set()
+        self.bestmove_allowed.set()
+        self.wait()
+
+    def wait(self):
+        if self.search_thread is not None:
+            self.search_thread.join()
+            self.search_thread = None
+
+        if self.ponder_timer is not None:
+            self.ponder_timer.cancel()
+            self.ponder_timer = None
+
+def main():
+    UCIEngine().run()
+
+if __name__ == "__main__":
+    main()
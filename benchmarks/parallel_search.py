@@ -0,0 +1,68 @@
+"""
+Measures the speedup of the root-parallel alpha-beta search (ai.parallel) over the 
+single process search of MiniMaxPlayer for different numbers of workers.
+
+Run from the root of the project: python -m benchmarks.parallel_search --workers 1 2 4
+"""
+import argparse
+import os
+import time
+
+import chess
+
+from ai.parallel import ParallelSearch
+from ai.players import MiniMaxPlayer
+
+POSITIONS = {
+    "start": chess.STARTING_FEN,
+    "kiwipete": "r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1",
+    "middlegame": "r1bq1rk1/pp2bppp/2n1pn2/3p4/2PP4/2N1PN2/PP2BPPP/R2QKB1R w KQ - 0 8",
+    "endgame": "8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1",
+}
+
+def time_search(fen: str, search_depth: int, workers: int, quiescence_depth: int) -> tuple:
+    """
+    Returns a tuple of the move, the number of nodes searched and the seconds the search took
+    """
+    board = chess.Board(fen)
+    player = MiniMaxPlayer(
+        board, "w" if board.turn else "b", search_depth=search_depth, search="alphabeta", 
+        quiescence_depth=quiescence_depth, workers=workers
+    )
+
+    if workers > 1:
+        # start the worker processes before timing the search
+        player.parallel_search = ParallelSearch(workers, player.hash_size_mb, quiescence_depth)
+        player.parallel_search.start()
+
+    try:
+        start = time.perf_counter()
+        move = player.choose_move()
+        elapsed = time.perf_counter() - start
+    finally:
+        player.close()
+
+    return move, player.nodes_searched, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--depth", type=int, default=3, help="search_depth of the players")
+    parser.add_argument("--quiescence-depth", type=int, default=4)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count()])
+    arguments = parser.parse_args()
+
+    print(f"{'position':<11} {'workers':>7} {'move':>6} {'nodes':>8} {'seconds':>8} {'speedup':>8}")
+
+    for name, fen in POSITIONS.items():
+        single_process_time = None
+
+        for workers in arguments.workers:
+            move, nodes, elapsed = time_search(fen, arguments.depth, workers, arguments.quiescence_depth)
+
+            if single_process_time is None:
+                single_process_time = elapsed
+
+            print(f"{name:<11} {workers:>7} {move.uci():>6} {nodes:>8} {elapsed:>8.2f} {single_process_time / elapsed:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+"""
+Measures move generation (perft), tree building, evaluation and search over a fixed set of positions
+and writes the results as JSON so that runs of different commits on the same machine can be compared.
+
+Run from the root of the project: python -m benchmarks.suite --output results.json
+"""
+import os
+
+# the JSON results may be written to stdout, which pygame's prompt would corrupt
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import argparse
+import datetime
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import chess
+
+from ai.players import AIPlayer, MiniMaxPlayer
+
+# positions with the known number of leaves of perft at depths 1, 2, ...
+POSITIONS = {
+    "start": (chess.STARTING_FEN, [20, 400, 8902, 197281]),
+    "kiwipete": ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", [48, 2039, 97862]),
+    "endgame": ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", [14, 191, 2812, 43238]),
+    "promotions": ("n1n5/PPPk4/8/8/8/8/4Kppp/5N1N b - - 0 1", [24, 496, 9483, 182838]),
+}
+
+def perft(board: chess.Board, depth: int) -> int:
+    """
+    Returns the number of positions reached after depth plies from the board
+    """
+    if depth == 1:
+        return board.legal_moves.count()
+
+    nodes = 0
+
+    for move in list(board.legal_moves):
+        board.push(move)
+        nodes += perft(board, depth - 1)
+        board.pop()
+
+    return nodes
+
+def get_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def benchmark_perft(board: chess.Board, expected: list) -> list:
+    results = []
+
+    for depth, expected_nodes in enumerate(expected, start=1):
+        start = time.perf_counter()
+        nodes = perft(board, depth)
+        elapsed = time.perf_counter() - start
+
+        results.append({
+            "depth": depth, "nodes": nodes, "correct": nodes == expected_nodes,
+            "seconds": elapsed, "nodes_per_second": nodes / elapsed if elapsed else None
+        })
+
+    return results
+
+def benchmark_tree_building(board: chess.Board, expected: list, max_depth: int, node_budget: int) -> list:
+    """
+    Builds the moves tree of 1 to max_depth plies, trees with more nodes than node_budget are skipped.
+    The peak memory is measured with tracemalloc in a second build so it doesn't slow the timed one
+    """
+    results = []
+    player = AIPlayer(board, "w" if board.turn else "b")
+
+    for depth in range(1, max_depth + 1):
+        # the tree has a node for every position reached in 1 to depth plies
+        nodes = sum(expected[:depth]) if depth <= len(expected) else None
+
+        if nodes is None or nodes > node_budget:
+            results.append({ "depth": depth, "nodes": nodes, "skipped": True })
+            continue
+
+        # compute_moves_tree doesn't count the first move in required_height
+        start = time.perf_counter()
+        tree = player.compute_moves_tree(required_height=depth - 1, board=board)
+        elapsed = time.perf_counter() - start
+
+        nodes = len(tree) - 1
+        del tree
+
+        tracemalloc.start()
+        tree = player.compute_moves_tree(required_height=depth - 1, board=board)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del tree
+
+        results.append({
+            "depth": depth, "nodes": nodes, "skipped": False, "seconds": elapsed,
+            "nodes_per_second": nodes / elapsed if elapsed else None, "peak_memory_bytes": peak
+        })
+
+    return results
+
+def benchmark_evaluation(board: chess.Board, calls: int) -> dict:
+    player = AIPlayer(board, "w")
+
+    start = time.perf_counter()
+
+    for _ in range(calls):
+        player.evaluate_board(board)
+
+    elapsed = time.perf_counter() - start
+
+    return { "calls": calls, "seconds": elapsed, "calls_per_second": calls / elapsed if elapsed else None }
+
+def benchmark_search(board: chess.Board, search_depth: int, quiescence_depth: int) -> dict:
+    """
+    Times a search with a new player, the peak memory is measured with tracemalloc in a second search
+    """
+    def create_player() -> MiniMaxPlayer:
+        return MiniMaxPlayer(
+            board, "w" if board.turn else "b", search_depth=search_depth, search="alphabeta",
+            quiescence_depth=quiescence_depth
+        )
+
+    player = create_player()
+    # allocate the transposition table before the search is timed
+    player.create_search()
+
+    start = time.perf_counter()
+    move = player.choose_move(board)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    create_player().choose_move(board)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "move": move.uci() if move else None, "plies": player.search_plies, "nodes": player.nodes_searched,
+        "seconds": elapsed, "nodes_per_second": player.nodes_searched / elapsed if elapsed else None,
+        "peak_memory_bytes": peak
+    }
+
+def run(
+    positions: list, tree_depth: int=4, node_budget: int=250000, evaluation_calls: int=20000,
+    search_depth: int=3, quiescence_depth: int=4, progress=None
+) -> dict:
+    """
+    Runs the benchmarks of the named positions and returns the results with information about the run
+    """
+    results = {
+        "commit": get_commit(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "chess": chess.__version__,
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "settings": {
+            "tree_depth": tree_depth, "node_budget": node_budget, "evaluation_calls": evaluation_calls,
+            "search_depth": search_depth, "quiescence_depth": quiescence_depth
+        },
+        "positions": {}
+    }
+
+    for name in positions:
+        fen, expected = POSITIONS[name]
+        board = chess.Board(fen)
+
+        if progress is not None:
+            progress(name)
+
+        results["positions"][name] = {
+            "fen": fen,
+            "perft": benchmark_perft(board, expected),
+            "tree_building": benchmark_tree_building(board, expected, tree_depth, node_budget),
+            "evaluation": benchmark_evaluation(board, evaluation_calls),
+            "search": benchmark_search(board, search_depth, quiescence_depth),
+        }
+
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--positions", nargs="+", default=list(POSITIONS), choices=list(POSITIONS))
+    parser.add_argument("--tree-depth", type=int, default=4, help="trees of 1 to this many plies are built")
+    parser.add_argument("--node-budget", type=int, default=250000, help="larger trees are skipped")
+    parser.add_argument("--evaluation-calls", type=int, default=20000)
+    parser.add_argument("--search-depth", type=int, default=3, help="search_depth of the alphabeta player")
+    parser.add_argument("--quiescence-depth", type=int, default=4)
+    parser.add_argument("--output", help="file the JSON results are written to, by default stdout")
+    arguments = parser.parse_args()
+
+    results = run(
+        arguments.positions, arguments.tree_depth, arguments.node_budget, arguments.evaluation_calls,
+        arguments.search_depth, arguments.quiescence_depth,
+        progress=lambda name: print(f"Benchmarking {name}", file=sys.stderr)
+    )
+
+    if arguments.output:
+        with open(arguments.output, "w") as file:
+            json.dump(results, file, indent=2)
+    else:
+        print(json.dumps(results, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Compares the nodes per second of AIPlayer.compute_moves_tree when every node deep copies 
+the board (AIPlayer.copy_boards = True) and when the moves are pushed and popped on one board.
+
+Run from the root of the project: python -m benchmarks.tree_building
+"""
+import argparse
+import time
+
+import chess
+
+from ai.players import AIPlayer
+
+# positions as tuples of a FEN and moves played from it. The cost of deepcopy grows with 
+# the length of the move stack so one of the positions is reached after a game of 40 plies
+POSITIONS = {
+    "start": (chess.STARTING_FEN, ""),
+    "kiwipete": ("r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1", ""),
+    "endgame": ("8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1", ""),
+    "ruy-lopez": (
+        chess.STARTING_FEN, 
+        "e4 e5 Nf3 Nc6 Bb5 a6 Ba4 Nf6 O-O Be7 Re1 b5 Bb3 d6 c3 O-O h3 Nb8 d4 Nbd7 "
+        "c4 c6 cxb5 axb5 Nc3 Bb7 Bg5 b4 Nb1 h6 Bh4 c5 dxe5 Nxe4 Bxe7 Qxe7 exd6 Qf6 Nbd2 Nxd6"
+    ),
+}
+
+def count_nodes(tree) -> int:
+    """
+    Counts the nodes of the tree without the "empty" root node
+    """
+    count = 0
+    stack = list(tree.root_node.children)
+
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children)
+
+    return count
+
+def time_tree_building(fen: str, moves: str, required_height: int, copy_boards: bool) -> tuple:
+    """
+    Returns a tuple of the number of nodes of the tree and the seconds it took to build it
+    """
+    board = chess.Board(fen)
+
+    for move in moves.split():
+        board.push_san(move)
+
+    player = AIPlayer(board, "w" if board.turn else "b")
+    player.copy_boards = copy_boards
+
+    start = time.perf_counter()
+    tree = player.compute_moves_tree(required_height=required_height, board=board)
+    elapsed = time.perf_counter() - start
+
+    return count_nodes(tree), elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split("\n")[0])
+    parser.add_argument("--height", type=int, default=1, help="required_height passed to compute_moves_tree")
+    arguments = parser.parse_args()
+
+    print(f"{'position':<10} {'mode':<10} {'nodes':>8} {'seconds':>9} {'nodes/sec':>10}")
+
+    for name, (fen, moves) in POSITIONS.items():
+        for copy_boards in (True, False):
+            nodes, elapsed = time_tree_building(fen, moves, arguments.height, copy_boards)
+            mode = "deepcopy" if copy_boards else "push/pop"
+
+            print(f"{name:<10} {mode:<10} {nodes:>8} {elapsed:>9.3f} {nodes / elapsed:>10.0f}")
+
+if __name__ == "__main__":
+    main()
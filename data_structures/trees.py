@@ -1,3 +1,6 @@
+from array import array
+from collections import deque
+
 class Node:
     def __init__(self, data, children: list=None, parent=None):
         self.data = data
@@ -9,13 +12,42 @@ class Node:
 
         self.parent = parent
 
+        # the number of edges between this node and the root of its tree
+        self.depth = parent.depth + 1 if parent is not None else 0
+
+    def update_from_parent(self):
+        """
+        Updates the metadata of this node that is computed from its parent, 
+        called when the node gets a new parent
+        """
+        self.depth = self.parent.depth + 1 if self.parent is not None else 0
+
+    def update_subtree_from_parent(self):
+        """
+        Updates the metadata of this node and of all its descendants, in constant time if it has no children
+        """
+        self.update_from_parent()
+
+        stack = list(self.children)
+
+        while stack:
+            descendant = stack.pop()
+            descendant.update_from_parent()
+            stack.extend(descendant.children)
+
     def add_child(self, node):
+        """
+        Adds a node as the last child of this one. The metadata of the node is updated in constant time 
+        if it has no children, otherwise that of all its descendants is updated
+        """
         self.children.append(node)
         node.parent = self
+        node.update_subtree_from_parent()
 
     def remove_child(self, index=-1):
         node = self.children.pop(index)
         node.parent = None
+        node.update_subtree_from_parent()
 
         return node
 
@@ -43,7 +75,7 @@ class Node:
         return self.compare(other) == -1
 
     def __gt__(self, other):
-        return self.compare(other) == -1
+        return self.compare(other) == 1
 
     def __gte__(self, other):
         return self.compare(other) >= 0
@@ -61,55 +93,169 @@ class Node:
         return f"{self.data}"
 
 class Tree:
+    """
+    The height (number of levels) and size (number of nodes) of the tree are kept up to date as 
+    nodes are added with add_node and removed with remove_node so reading them is constant time
+    """
     def __init__(self, root_node: Node=None) -> None:
         self.root_node = root_node
         self.height = 0
+        self.size = 0
+
+        if root_node is not None:
+            self.size, self.height = self.count_nodes_and_levels(root_node)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def count_nodes_and_levels(self, node: Node) -> tuple:
+        """
+        Returns a tuple of the number of nodes and the number of levels of the subtree of node
+        """
+        size = 0
+        deepest = node.depth
+
+        for _node in self.iter_preorder(node):
+            size += 1
+
+            if _node.depth > deepest:
+                deepest = _node.depth
+
+        return size, deepest - node.depth + 1
 
     def get_height(self, node=None) -> int:
-        modify_height = False
+        """
+        Returns the number of levels of the tree or of the subtree of node if it is passed. 
+        The height of the tree is kept up to date, that of a subtree is computed
+        """
+        if node is None:
+            return self.height
+
+        return self.count_nodes_and_levels(node)[1]
+
+    def add_node(self, parent_node: Node, new_node: Node):
+        parent_node.add_child(new_node)
 
+        if new_node.children:
+            size, height = self.count_nodes_and_levels(new_node)
+        else:
+            size, height = 1, 1
+
+        self.size += size
+        self.height = max(self.height, new_node.depth - self.root_node.depth + height)
+
+    def remove_node(self, node: Node) -> Node:
+        """
+        Removes a node and its descendants from the tree and returns it
+        """
+        parent = node.parent
+        parent.remove_child( parent.children.index(node) )
+
+        size, height = self.count_nodes_and_levels(node)
+        self.size -= size
+
+        if parent.depth - self.root_node.depth + 1 + height >= self.height:
+            # the removed subtree may have been the deepest one
+            self.height = self.count_nodes_and_levels(self.root_node)[1]
+
+        return node
+
+    def dfs(self, node=None) -> list:
+        """
+        Depth First Search on the tree, returns the nodes in the order they were visited 
+        (each node before its children, the children from the last to the first)
+        """
+        return list( self.iter_preorder(node, reverse_children=True) )
+
+    def iter_preorder(self, node=None, reverse_children=False):
+        """
+        Yields the nodes of the subtree of node (the whole tree by default), each node before its children
+        """
         if node is None:
             node = self.root_node
-            modify_height = True
 
-        if not node:
-            return 0
+        if node is None:
+            return
 
-        if not node.children:
-            return 1
+        stack = [node]
+
+        while stack:
+            node = stack.pop()
+
+            yield node
+
+            # the stack is last in first out so the children are added in reverse to be visited in order
+            stack.extend( node.children if reverse_children else reversed(node.children) )
 
-        child_heights = [ self.get_height(child) for child in node.children ]
+    def iter_postorder(self, node=None):
+        """
+        Yields the nodes of the subtree of node, each node after its children
+        """
+        if node is None:
+            node = self.root_node
 
-        height = max( child_heights ) + 1
+        if node is None:
+            return
 
-        if modify_height:
-            self.height = height
+        # tuples of a node and whether its children have already been added to the stack
+        stack = [ (node, False) ]
 
-        return height
+        while stack:
+            node, children_added = stack.pop()
 
-    def add_node(self, parent_node: Node, new_node: Node):
-        parent_node.add_child(new_node)
+            if children_added or not node.children:
+                yield node
+            else:
+                stack.append( (node, True) )
+                stack.extend( (child, False) for child in reversed(node.children) )
+
+    def iter_bfs(self, node=None):
+        """
+        Breadth First Search, yields the nodes of the subtree of node level by level
+        """
+        if node is None:
+            node = self.root_node
+
+        if node is None:
+            return
+
+        queue = deque([node])
+
+        while queue:
+            node = queue.popleft()
+
+            yield node
 
-        self.height += self.get_height(new_node) - 1
+            queue.extend(node.children)
 
-    def dfs(self, visited=None, node=None):
+    def iter_leaves(self, node=None):
         """
-        Depth First Search on the tree
+        Yields the leaf nodes of the subtree of node from the first to the last
+        """
+        for _node in self.iter_preorder(node):
+            if not _node.children:
+                yield _node
+
+    def iter_nodes_at_depth(self, depth: int, node=None):
+        """
+        Yields the nodes that are depth levels below node (the root node is at depth 0). 
+        Nodes deeper than depth are not visited
         """
-        if visited is None:
-            visited = []
         if node is None:
             node = self.root_node
 
-        if node not in visited:
-            visited.append(node)
-            print(f"Node {node.__str__()} has been visited")
-            print(f"The visited nodes are: {[ n.__str__() for n in visited ]}")
+        if node is None:
+            return
 
-        for child in node.children[::-1]:
-            self.dfs(visited, child)
+        stack = [ (node, 0) ]
+
+        while stack:
+            node, node_depth = stack.pop()
 
-        return visited
+            if node_depth == depth:
+                yield node
+            else:
+                stack.extend( (child, node_depth + 1) for child in reversed(node.children) )
 
     def find_smallest_and_largest_node(self, visited=None, node=None, minimum_node=None, maximum_node=None, search_depth=None) -> tuple:
         """
@@ -138,39 +284,147 @@ class Tree:
 
         return ( minimum_node, maximum_node, visited )
 
-    def get_leaf_nodes(self, root_node: Node=None):
-        leaf_nodes = []
+    def get_leaf_nodes(self, node=None) -> list:
+        return list( self.iter_leaves(node) )
 
-        if root_node is None:
-            root_node = self.root_node
+class ArrayNodeData:
+    """
+    The data of a node of an ArrayTree, read from the tree's columns when it is created
+    """
+    __slots__ = ("move", "evaluation", "fullmove_number")
 
-        if not root_node:
-            return None
-        
-        if not root_node.children:
-            return root_node
-        
-        for child in root_node.children:
-            leaf_nodes.append( [node for node in self.get_leaf_nodes(child)] )
+    def __init__(self, move: int, evaluation: float, fullmove_number: int) -> None:
+        self.move = move
+        self.evaluation = evaluation
+        self.fullmove_number = fullmove_number
 
-        return leaf_nodes
+    def __str__(self) -> str:
+        return f"move: {self.move}, evaluation: {self.evaluation}, move number: {self.fullmove_number}"
 
-    def get_leaf_nodes(self, visited=None, node=None, leaf_nodes=None):
-        if visited is None:
-            visited = []
-        if leaf_nodes is None:
-            leaf_nodes = []
+class ArrayNode:
+    """
+    A lightweight view of a node of an ArrayTree with the same navigation attributes as Node.
+    Views are created on demand and only hold the tree and the index of the node
+    """
+    __slots__ = ("tree", "index")
 
-        if node is None:
-            node = self.root_node
+    def __init__(self, tree, index: int) -> None:
+        self.tree = tree
+        self.index = index
 
-        if node not in visited:
-            visited.append(node)
+    @property
+    def data(self) -> ArrayNodeData:
+        return self.tree.get_data(self.index)
+
+    @property
+    def children(self) -> list:
+        return [ ArrayNode(self.tree, index) for index in self.tree.iter_children(self.index) ]
 
-            if not node.children:
-                leaf_nodes.append(node)
+    @property
+    def parent(self):
+        index = self.tree.parents[self.index]
+
+        return ArrayNode(self.tree, index) if index != ArrayTree.NO_NODE else None
+
+    def is_leaf_node(self) -> bool:
+        return self.tree.first_children[self.index] == ArrayTree.NO_NODE
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, ArrayNode) and self.tree is other.tree and self.index == other.index
+
+    def __hash__(self) -> int:
+        return hash((id(self.tree), self.index))
+
+    def __str__(self) -> str:
+        return f"{self.data}"
+
+class ArrayTree:
+    """
+    A tree of moves stored as a struct of arrays instead of a Node object per move.
+    Node i is described by the i-th item of each column:
+
+    - moves: the move encoded in 16 bits
+    - evaluations: the evaluation of the position after the move
+    - fullmove_numbers: the fullmove number of the position after the move
+    - parents, first_children, next_siblings: the indexes of the node's parent, first child and 
+      next sibling or NO_NODE. The children of a node are a linked list starting at its first child
+
+    A node costs 28 bytes in total. The root node is at index 0
+    """
+    NO_NODE = -1
+    ROOT = 0
+
+    def __init__(self) -> None:
+        self.moves = array('H')
+        self.evaluations = array('d')
+        self.fullmove_numbers = array('H')
+        self.parents = array('i')
+        self.first_children = array('i')
+        self.next_siblings = array('i')
+        # the last child of each node so that children can be appended in constant time
+        self.last_children = array('i')
+
+        self.add_node(self.NO_NODE)
+
+    def __len__(self) -> int:
+        return len(self.parents)
+
+    @property
+    def root_node(self) -> ArrayNode:
+        return ArrayNode(self, self.ROOT)
+
+    def add_node(self, parent: int, move: int=0, evaluation: float=0, fullmove_number: int=0) -> int:
+        """
+        Adds a node as the last child of the node at index parent and returns the new node's index
+        """
+        index = len(self.parents)
+
+        self.moves.append(move)
+        self.evaluations.append(evaluation)
+        self.fullmove_numbers.append(fullmove_number)
+        self.parents.append(parent)
+        self.first_children.append(self.NO_NODE)
+        self.next_siblings.append(self.NO_NODE)
+        self.last_children.append(self.NO_NODE)
+
+        if parent != self.NO_NODE:
+            last_child = self.last_children[parent]
+
+            if last_child == self.NO_NODE:
+                self.first_children[parent] = index
+            else:
+                self.next_siblings[last_child] = index
+
+            self.last_children[parent] = index
+
+        return index
+
+    def iter_children(self, index: int):
+        """
+        Yields the indexes of the children of the node at index
+        """
+        child = self.first_children[index]
+
+        while child != self.NO_NODE:
+            yield child
+            child = self.next_siblings[child]
+
+    def get_parent(self, index: int) -> int:
+        return self.parents[index]
+
+    def is_leaf(self, index: int) -> bool:
+        return self.first_children[index] == self.NO_NODE
+
+    def get_data(self, index: int) -> ArrayNodeData:
+        return ArrayNodeData(self.moves[index], self.evaluations[index], self.fullmove_numbers[index])
+
+    def get_memory_usage(self) -> int:
+        """
+        Returns the number of bytes used by the columns
+        """
+        columns = (
+            self.moves, self.evaluations, self.fullmove_numbers, self.parents, 
+            self.first_children, self.next_siblings, self.last_children
+        )
 
-        for child in node.children:
-            self.get_leaf_nodes(visited, child, leaf_nodes)
-        
-        return leaf_nodes
+        return sum( column.itemsize * len(column) for column in columns )
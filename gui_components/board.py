@@ -3,6 +3,7 @@ import chess
 import pygame
 
 from gui_components.pieces import Piece
+from tracing import board_logger, enabled, render_logger, trace
 
 class Square(pygame.Rect):
     def __init__(self, left: float, top: float, width: float, height: float, background_color: str, border_color: str, piece: Piece = None) -> None:
@@ -102,8 +103,7 @@ class ChessBoard(Board):
         self.dark_square_color = dark_square_color
         self.board = board
         self.move_hints = move_hints
-        print('The current board is')
-        print(self.board)
+        board_logger.debug("The current board is\n%s", self.board)
         self.rect = pygame.Rect(left, top, width, height)
 
         self.create_squares()
@@ -192,7 +192,7 @@ class ChessBoard(Board):
         board_rect = pygame.Rect(self.left, self.top, self.width, self.height)
 
         for (i, rank) in enumerate(self.squares):
-            print(f"Flipping the squares on rank: {8 - i}")
+            render_logger.debug("Flipping the squares on rank: %s", 8 - i)
             for (j, square) in enumerate(rank):
                 square: ChessSquare = square
                 _old = square.__repr__()
@@ -201,11 +201,13 @@ class ChessBoard(Board):
                 square.y += (7 - i) * self.square_size
                 
                 if not square.colliderect(board_rect):
-                    print("Square is out of bounds of the board")
-                    print(f"The board rectangle is: {board_rect}. The square rectangle is: {square}")
+                    render_logger.warning(
+                        "Square is out of bounds of the board. The board rectangle is: %s. The square rectangle is: %s", 
+                        board_rect, square
+                    )
 
                 else:
-                    print(f"Square was flipped successfully. Old coordinates: {_old}, new: {square}")
+                    render_logger.debug("Square was flipped successfully. Old coordinates: %s, new: %s", _old, square)
 
         self.is_flipped = not self.is_flipped
 
@@ -274,7 +276,7 @@ class ChessBoard(Board):
             square = square[0]
 
             return square
-        print(f"There is no square at the {coordinates} coordinates")
+        board_logger.debug("There is no square at the %s coordinates", coordinates)
         return None
 
     def get_move_notation(self, source_square: ChessSquare, destination_square: ChessSquare):
@@ -371,12 +373,13 @@ class ChessBoard(Board):
             self.current_move_square = self.get_square_from_chess_square(destination_chess_square)
         
         else:
-            print("None of the conditions were fulfilled. No move is currently being made")
+            board_logger.warning("None of the conditions were fulfilled. No move is currently being made")
         
         self.place_pieces()
 
-        print('The current board is')
-        print(self.board)
+        if enabled(board_logger):
+            trace(board_logger, "move", move=str(move), fen=self.board.fen())
+        board_logger.debug("The current board is\n%s", self.board)
 
     def make_move(self, move):
         """
@@ -390,7 +393,7 @@ class ChessBoard(Board):
                 destination_square: ChessSquare = self.get_square_from_chess_square(move.to_square)
                 piece: Piece = destination_square.piece
                 
-                print("The move was a capture")
+                board_logger.debug("The move was a capture")
 
                 if piece is not None:
                     piece.set_is_captured(True)
@@ -7,6 +7,7 @@ from gui_components.board import ChessBoard
 import pygame
 
 from gui_components.pieces import Piece
+from tracing import render_logger
 
 BLACK_COLOR = (0, 0, 0)
 WHITE_COLOR = (255, 255, 255)
@@ -38,11 +39,13 @@ class ChessGame:
     def __init__(
         self, screen: pygame.Surface, players: dict, 
         show_ranks_and_files=True, show_captured_pieces=True, screen_width=500, screen_height=500, 
-        origin: tuple=None, board=None
+        origin: tuple=None, board=None, show_statistics=False
     ) -> None:
         self.players = players
         self.show_ranks_and_files = show_ranks_and_files
         self.show_captured_pieces = show_captured_pieces
+        # draw the statistics of the last search of the AI players at the bottom of the screen
+        self.show_statistics = show_statistics
         self.screen = screen
         self.screen_rect = screen.get_rect()
 
@@ -67,7 +70,7 @@ class ChessGame:
 
         self.ai_playing = False
 
-        print(f"Board rectangle is: {self.board.rect}")
+        render_logger.debug("Board rectangle is: %s", self.board.rect)
 
     def create_gui_chess_board(self, board: chess.Board) -> ChessBoard:
         dimensions = self.get_board_dimensions()
@@ -167,7 +170,7 @@ class ChessGame:
             except TypeError as e:
                 raise e
             except FileNotFoundError as e:
-                print(f"Image file for piece was not found")
+                render_logger.error("Image file for piece %s was not found", piece)
                 raise e
 
         def draw_text(text: str, text_color=None, font_size=15, font_family='helvetica', rect: pygame.Rect=None, center_coordinates: tuple=None):
@@ -256,11 +259,10 @@ class ChessGame:
                     try:
                         draw_piece(square.piece, square)
                     except TypeError as e:
-                        print(f"The square's piece is: ")
-                        print(square.piece)
+                        render_logger.error("The square's piece is: %s", square.piece)
                         raise e
                     except FileNotFoundError as e:
-                        print(f"Error on the square on the {i}th rank and the {j}th rank")
+                        render_logger.error("Error on the square on the %sth rank and the %sth rank", i, j)
                         raise e
 
                 if self.show_ranks_and_files and (square.rank_number == 0 or square.file_number == 0):
@@ -371,6 +373,35 @@ class ChessGame:
         #             draw_rectangle(square, BLACK_COLOR if i==0 else WHITE_COLOR, 1 )
         #             draw_piece(piece, rect=square)
 
+    def draw_statistics(self):
+        lines = []
+
+        for color, player in self.players.items():
+            result = getattr(player, "last_search_result", None)
+
+            if result is None or getattr(result, "statistics", None) is None:
+                continue
+
+            statistics = result.statistics
+
+            lines.append(
+                f"{'White' if color else 'Black'}: {result.move} in {statistics.time:.2f}s, "
+                f"{statistics.nodes} nodes, {statistics.leaf_evaluations} evaluations, "
+                f"branching {statistics.effective_branching_factor():.1f}, "
+                f"hash hits {statistics.transposition_hit_rate():.0%}"
+            )
+
+        font_size = 11
+        font = pygame.font.SysFont('helvetica', font_size)
+
+        for i, line in enumerate(lines):
+            text = font.render(line, True, self.dark_square_color)
+            text_rect = text.get_rect()
+            text_rect.left = self.origin[0] + 5
+            text_rect.bottom = self.origin[1] + self.screen_height - 2 - (len(lines) - 1 - i) * (font_size + 2)
+
+            self.screen.blit(text, text_rect)
+
     def play_sound(self):
         if self.board.board.is_checkmate():
             if not self.game_over:
@@ -434,6 +465,9 @@ class ChessGame:
 
             self.draw_board()
 
+            if self.show_statistics:
+                self.draw_statistics()
+
             if isinstance(self.current_player, ai_players.AIPlayer):
                 if not self.ai_playing:
                     # to prevent the thread from being created multiple times
@@ -442,8 +476,13 @@ class ChessGame:
 
             pygame.display.flip()
 
+        # stop the players pondering in the background
+        for player in self.players.values():
+            if isinstance(player, ai_players.AIPlayer):
+                player.close()
+
         pygame.quit()
-        print("Window closed")
+        render_logger.info("Window closed")
     
     def play_in_thread(self):
         thread = threading.Thread(target=lambda: self.play())
@@ -12,6 +12,10 @@ from gui_components.board import ChessBoard
 from gui_components.components import BorderedRectangle
 
 from ai import players as ai_players
+import tracing
+from tracing import board_logger, render_logger
+
+tracing.configure_from_environment()
 
 pygame.init()
 
@@ -68,7 +72,7 @@ def draw_captured_images(rectangle: pygame.Rect, captured_pieces_list, margin_le
         screen.blit(image, image_rect)
 
     if difference is not None:
-        print("In draw_captured_images() the difference is not None")
+        render_logger.debug("In draw_captured_images() the difference is not None")
         font = pygame.font.SysFont('helvetica', 15)
         text = font.render(f"+{difference}", True, DARK_COLOR )
         text_rect = text.get_rect()
@@ -172,7 +176,7 @@ def draw_chessboard(board: ChessBoard, flip=False):
                 except TypeError as e:
                     raise e
                 except FileNotFoundError as e:
-                    print(f"Error on the square on the {i}th rank and the {j}th rank")
+                    render_logger.error("Error on the square on the %sth rank and the %sth rank", i, j)
                     raise e
             
             if square.is_possible_move and board.move_hints:
@@ -203,7 +207,7 @@ def play(source_coordinates: tuple=None, destination_coordinates: tuple=None):
 
     player = players[turn]
     turns_taken[turn] = not turns_taken[turn]
-    print(f"Setting {turns_taken[turn]} to {not turns_taken[turn]}")
+    board_logger.debug("Setting %s to %s", turns_taken[turn], not turns_taken[turn])
 
     if not isinstance(player, str):
         # AI model to play
@@ -214,12 +218,12 @@ def play(source_coordinates: tuple=None, destination_coordinates: tuple=None):
         
         if isinstance(players[TURN], ai_players.AIPlayer):
             # if the next player is an AI, automatically play
-            print("Next player is AI, making a move for them automaically")
+            board_logger.debug("Next player is AI, making a move for them automatically")
             # sleep(5)
     else:
         if source_coordinates and destination_coordinates:
             # user to play
-            print("User is making move")
+            board_logger.debug("User is making move")
             chess_board.play(source_coordinates, destination_coordinates)
             play_sound(board)
             TURN = not TURN
@@ -228,7 +232,7 @@ def play(source_coordinates: tuple=None, destination_coordinates: tuple=None):
         IS_FIRST_MOVE = False
     
     turns_taken[turn] = not turns_taken[turn]
-    print(f"Setting {turns_taken[turn]} to {not turns_taken[turn]}")
+    board_logger.debug("Setting %s to %s", turns_taken[turn], not turns_taken[turn])
 
 
 def click_handler(position):
@@ -249,7 +253,7 @@ def click_handler(position):
                 SOURCE_POSITION = None
             else:
                 destination_square = destination_square[0]
-                print(f"In main.py, about to play, the source and destination are {SOURCE_POSITION} and {position} respectively")
+                board_logger.debug("In main.py, about to play, the source and destination are %s and %s respectively", SOURCE_POSITION, position)
                 chess_board.get_possible_moves(SOURCE_POSITION, remove_hints=True)
                 
                 # chess_board.play( SOURCE_POSITION, position )
@@ -273,10 +277,10 @@ while running:
     draw_chessboard(chess_board, True)
 
     if not isinstance(players[TURN], str) and IS_FIRST_MOVE:
-        print("It is the first move and there is no human player")
+        board_logger.debug("It is the first move and there is no human player")
         play()
     elif not isinstance(players[TURN], str) and not turns_taken[TURN]:
-        print("AI's turn to play")
+        board_logger.debug("AI's turn to play")
         thread = threading.Thread(target=lambda: play())
         thread.start()
         # play()
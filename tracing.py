@@ -0,0 +1,106 @@
+"""
+Leveled tracing with the logging module instead of print statements.
+
+Each subsystem has its own logger: ai (players and searches), board (the moves made on the ChessBoard)
+and render (drawing the game). Nothing is written until configure is called and messages below the
+configured level cost a level check, so expensive messages are built only if enabled(logger) is True.
+
+Tracing can be configured from the environment, e.g.
+CHESS_PYGAME_TRACE="ai=debug,board=info" CHESS_PYGAME_TRACE_FILE=trace.jsonl python main.py
+writes the messages to stderr and each of them as a JSON object to trace.jsonl for offline analysis
+"""
+import json
+import logging
+import os
+
+ROOT_LOGGER_NAME = "chess_pygame"
+
+ai_logger = logging.getLogger(f"{ROOT_LOGGER_NAME}.ai")
+board_logger = logging.getLogger(f"{ROOT_LOGGER_NAME}.board")
+render_logger = logging.getLogger(f"{ROOT_LOGGER_NAME}.render")
+
+SUBSYSTEMS = {
+    "ai": ai_logger,
+    "board": board_logger,
+    "render": render_logger
+}
+
+def enabled(logger: logging.Logger, level: int=logging.DEBUG) -> bool:
+    return logger.isEnabledFor(level)
+
+def trace(logger: logging.Logger, event: str, level: int=logging.DEBUG, **fields):
+    """
+    Logs an event with fields that are written as they are to the trace file
+    """
+    if logger.isEnabledFor(level):
+        logger.log(level, "%s %s", event, fields, extra={"event": event, "fields": fields})
+
+class JSONLinesFormatter(logging.Formatter):
+    """
+    Formats every record as a JSON object on its own line
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": record.created,
+            "subsystem": record.name[len(ROOT_LOGGER_NAME) + 1:] or record.name,
+            "level": record.levelname,
+            "thread": record.threadName,
+            "event": getattr(record, "event", None),
+            "message": record.getMessage(),
+        }
+
+        fields = getattr(record, "fields", None)
+
+        if fields:
+            data["fields"] = fields
+
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+
+        return json.dumps(data, default=str)
+
+def configure(levels: dict=None, trace_file: str=None, stream=None):
+    """
+    levels maps subsystem names to levels (names like "debug" or numbers), the other subsystems
+    log warnings and errors only. If trace_file is passed the records are also appended to it as JSON lines
+    """
+    root_logger = logging.getLogger(ROOT_LOGGER_NAME)
+    root_logger.setLevel(logging.WARNING)
+    root_logger.propagate = False
+
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+        handler.close()
+
+    for name, logger in SUBSYSTEMS.items():
+        level = (levels or {}).get(name, logging.NOTSET)
+        logger.setLevel(level.upper() if isinstance(level, str) else level)
+
+    stream_handler = logging.StreamHandler(stream)
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(name)s %(levelname)s %(message)s"))
+    root_logger.addHandler(stream_handler)
+
+    if trace_file:
+        file_handler = logging.FileHandler(trace_file)
+        file_handler.setFormatter(JSONLinesFormatter())
+        root_logger.addHandler(file_handler)
+
+def configure_from_environment():
+    """
+    Configures tracing from CHESS_PYGAME_TRACE (comma separated subsystem=level pairs)
+    and CHESS_PYGAME_TRACE_FILE if either of them is set
+    """
+    setting = os.environ.get("CHESS_PYGAME_TRACE", "")
+    trace_file = os.environ.get("CHESS_PYGAME_TRACE_FILE")
+
+    if not setting and not trace_file:
+        return
+
+    levels = {}
+
+    for pair in setting.split(","):
+        if "=" in pair:
+            name, level = pair.split("=", 1)
+            levels[name.strip()] = level.strip()
+
+    configure(levels, trace_file)